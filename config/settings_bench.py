@@ -0,0 +1,23 @@
+"""
+Settings for the benchmark commands.
+
+Runs against an isolated database (a local SQLite file unless BENCH_DATABASE_URL
+points at e.g. a local Postgres) and a per-process cache, so numbers are
+reproducible and seeding never touches real data:
+
+    DJANGO_SETTINGS_MODULE=config.settings_bench python manage.py migrate
+    DJANGO_SETTINGS_MODULE=config.settings_bench python manage.py seed_bench_data
+    DJANGO_SETTINGS_MODULE=config.settings_bench python manage.py bench_api --baseline sqlite
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, env
+
+DEBUG = False
+
+DATABASES = {
+    'default': env.db('BENCH_DATABASE_URL', default=f"sqlite:///{BASE_DIR / 'bench.sqlite3'}"),
+}
+
+CACHES = {
+    'default': env.cache('BENCH_CACHE_URL', default='locmemcache://bench'),
+}
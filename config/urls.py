@@ -4,6 +4,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
+from core.views import CacheStatsView, metrics_view
 
 # @csrf_exempt
 # def test_view(request):
@@ -17,6 +18,8 @@ urlpatterns = [
     path('api/cart/', include('core.cart.urls')),
     path('api/chat/', include('core.chat.urls')),
     path('api/notification/', include('core.notification.urls')),
+    path('api/cache-stats/', CacheStatsView.as_view(), name='cache_stats'),
+    path('metrics', metrics_view, name='metrics'),
     # path('test/', test_view),
 
     
@@ -5,3 +5,10 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     label = 'core'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from core.utils.db import collect_pool_stats
+        from core.utils.metrics import registry
+
+        registry.register_collector(collect_pool_stats)
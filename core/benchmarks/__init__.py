@@ -0,0 +1,7 @@
+"""
+Performance benchmarks, run as ``bench_*`` management commands against seeded data.
+
+They measure latency, queries and sizes and compare them with stored baselines;
+correctness is covered by each app's tests, and core/tests.py runs every in-process
+benchmark once on a tiny dataset so the commands don't rot.
+"""
@@ -0,0 +1,60 @@
+"""Compression cost vs. bytes saved on real API payloads, per encoding and level."""
+import time
+
+from core.chat.models import Message
+from core.chat.serializers import ChatSerializer
+from core.middleware import compression
+from core.product.models import Category, Product
+from core.product.serializers import CategorySerializer, ProductSerializer
+from core.utils.renderers import dumps
+from .micro import drf_request, fixed_rates
+from .report import summarize
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_LEVELS = (1, 4, 5, 11)
+COLUMNS = ["bytes", "compressed", "ratio", "p50_ms", "p95_ms", "mb_per_s"]
+
+
+def payloads(page_size=100):
+    """Return {name: rendered JSON bytes} for the largest responses."""
+    if not Product.objects.exists():
+        raise ValueError("No products found; run seed_bench_data first.")
+    request = drf_request()
+    with fixed_rates():
+        products = Product.objects.select_related("category", "city", "seller").order_by("-created_at")[:page_size]
+        return {
+            f"products x{page_size}": dumps(ProductSerializer(products, many=True, context={"request": request}).data),
+            "categories": dumps(CategorySerializer(Category.objects.all(), many=True, context={"request": request}).data),
+            f"messages x{page_size}": dumps(
+                ChatSerializer(Message.objects.select_related("sender", "conversation")[:page_size], many=True).data
+            ),
+        }
+
+
+def measure(data, encoding, level, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compressed = compression.compress(data, encoding, level)
+        latencies.append(time.perf_counter() - start)
+    summary = summarize(latencies)
+    summary.update(
+        bytes=len(data),
+        compressed=len(compressed),
+        ratio=round(len(compressed) / len(data), 3),
+        mb_per_s=round(len(data) / summary["p50_ms"] / 1000, 1) if summary["p50_ms"] else None,
+    )
+    return summary
+
+
+def run(page_size=100, repeat=50):
+    """Return {"<payload> <encoding>-<level>": summary} for every available encoding."""
+    settings = [("gzip", level) for level in GZIP_LEVELS]
+    if compression.brotli is not None:
+        settings += [("br", level) for level in BROTLI_LEVELS]
+
+    results = {}
+    for name, data in payloads(page_size).items():
+        for encoding, level in settings:
+            results[f"{name} {encoding}-{level}"] = measure(data, encoding, level, repeat)
+    return results
@@ -0,0 +1,125 @@
+"""Deterministic dataset generator for benchmarks."""
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from core.cart.models import Cart, CartItem
+from core.chat.models import Conversation, Message
+from core.product.models import Category, City, Favorite, Product
+from core.user.models import User
+
+BENCH_EMAIL_DOMAIN = "bench.example.com"
+BENCH_PASSWORD = "bench-password"
+REGIONS = ["Addis Ababa", "Oromia", "Amhara", "Tigray", "Sidama", "Somali", "Afar", "Dubai", "Abu Dhabi"]
+
+
+def bench_email(index):
+    return f"user{index}@{BENCH_EMAIL_DOMAIN}"
+
+
+def flush():
+    """Remove everything a previous seed() created."""
+    with transaction.atomic():
+        User.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}").delete()  # Cascades to listings, chats, carts
+        Category.objects.filter(name__startswith="Bench ").delete()
+        City.objects.filter(name__startswith="Bench ").delete()
+
+
+@transaction.atomic
+def seed(users=200, categories=40, depth=3, cities=30, products=2000, favorites=10,
+         cart_items=3, conversations=300, messages=10, seed=42):
+    """
+    Create a reproducible dataset and return the number of rows created per model.
+
+    ``favorites`` and ``cart_items`` are per user, ``messages`` per conversation. Categories
+    are spread over ``depth`` levels so recursive category serialization has real work to do.
+    """
+    rng = random.Random(seed)
+    password = make_password(BENCH_PASSWORD)  # Hash once; hashing per user would dominate seeding
+
+    user_rows = User.objects.bulk_create([
+        User(
+            email=bench_email(i), password=password, first_name=f"User{i}", last_name="Bench",
+            role="vendor" if i % 4 == 0 else "customer",
+        )
+        for i in range(users)
+    ])
+    vendors = [user for user in user_rows if user.role == "vendor"] or user_rows
+
+    city_rows = City.objects.bulk_create([
+        City(name=f"Bench City {i}", region=REGIONS[i % len(REGIONS)]) for i in range(cities)
+    ])
+
+    category_rows = []
+    level = [None]
+    per_level = max(categories // max(depth, 1), 1)
+    for depth_index in range(depth):
+        count = per_level if depth_index < depth - 1 else categories - len(category_rows)
+        created = Category.objects.bulk_create([
+            Category(name=f"Bench Category {len(category_rows) + i}", parent=rng.choice(level))
+            for i in range(count)
+        ])
+        category_rows.extend(created)
+        level = created or level
+
+    currencies = ["ETB", "ETB", "ETB", "USD", "AED"]
+
+    def make_product(i):
+        seller = rng.choice(vendors)
+        return Product(
+            title=f"Bench product {i}",
+            description=f"Benchmark listing number {i} " * 5,
+            price=Decimal(rng.randint(100, 500000)) / 100,
+            currency=rng.choice(currencies),
+            category=rng.choice(category_rows),
+            city=rng.choice(city_rows),
+            seller=seller,
+            owner=seller,
+            status=rng.choice(["active", "active", "active", "sold", "expired"]),
+        )
+
+    product_rows = Product.objects.bulk_create([make_product(i) for i in range(products)], batch_size=500)
+
+    favorite_rows = Favorite.objects.bulk_create([
+        Favorite(user=user, product=product)
+        for user in user_rows
+        for product in rng.sample(product_rows, min(favorites, len(product_rows)))
+    ], batch_size=1000)
+
+    cart_rows = Cart.objects.bulk_create([Cart(user=user) for user in user_rows])
+    cart_item_rows = CartItem.objects.bulk_create([
+        CartItem(cart=cart, product=product, quantity=rng.randint(1, 3))
+        for cart in cart_rows
+        for product in rng.sample(product_rows, min(cart_items, len(product_rows)))
+    ], batch_size=1000)
+
+    pairs = set()
+    while len(pairs) < min(conversations, len(user_rows) * (len(user_rows) - 1)):
+        sender, receiver = rng.sample(user_rows, 2)
+        pairs.add((sender, receiver))
+    conversation_rows = Conversation.objects.bulk_create([
+        Conversation(sender=sender, receiver=receiver) for sender, receiver in pairs
+    ])
+    message_rows = Message.objects.bulk_create([
+        Message(
+            conversation=conversation,
+            sender=rng.choice([conversation.sender, conversation.receiver]),
+            content=f"Is this still available? ({i})",
+            is_read=rng.random() < 0.5,
+        )
+        for conversation in conversation_rows
+        for i in range(messages)
+    ], batch_size=1000)
+
+    return {
+        "users": len(user_rows),
+        "cities": len(city_rows),
+        "categories": len(category_rows),
+        "products": len(product_rows),
+        "favorites": len(favorite_rows),
+        "carts": len(cart_rows),
+        "cart_items": len(cart_item_rows),
+        "conversations": len(conversation_rows),
+        "messages": len(message_rows),
+    }
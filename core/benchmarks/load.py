@@ -0,0 +1,89 @@
+"""In-process load driver: replays requests against the main endpoints through Django's test client."""
+import threading
+import time
+
+from django.db import connection, connections
+from django.test import Client
+from core.product.models import Product
+from core.user.authentication import UserClaimsRefreshToken
+from core.user.models import User
+from core.utils.db import QueryCounter
+from .datagen import BENCH_EMAIL_DOMAIN
+from .micro import fixed_rates
+from .report import summarize
+
+# (name, path template, authenticated)
+ENDPOINTS = [
+    ("product-list", "/api/product/", True),
+    ("product-list-usd", "/api/product/?currency=USD", True),
+    ("product-list-page100", "/api/product/?page_size=100", True),
+    ("product-detail", "/api/product/{product_id}/", True),
+    ("product-search", "/api/product/?search=number+1&ordering=price", True),
+    ("categories", "/api/product/categories/", False),
+    ("cities", "/api/product/cities/", False),
+    ("favorites", "/api/product/favorites/", True),
+    ("my-listings", "/api/product/my-listings/", True),
+    ("conversations", "/api/chat/conversations/", True),
+    ("messages", "/api/chat/messages/", True),
+    ("cart", "/api/cart/", True),
+]
+
+
+def bench_user():
+    user = User.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}", role="vendor").order_by("id").first()
+    if user is None:
+        raise ValueError("No benchmark users found; run seed_bench_data first.")
+    return user
+
+
+def _worker(path, headers, requests, latencies, queries, errors):
+    client = Client()
+    counter = QueryCounter()
+    try:
+        with connection.execute_wrapper(counter):
+            for _ in range(requests):
+                before = counter.count
+                start = time.perf_counter()
+                response = client.get(path, **headers)
+                latencies.append(time.perf_counter() - start)
+                queries.append(counter.count - before)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+    finally:
+        connections.close_all()
+
+
+def run_endpoint(path, authenticated, token, requests=200, concurrency=1, warmup=10):
+    headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if authenticated else {}
+    _worker(path, headers, warmup, [], [], [])
+
+    latencies, queries, errors = [], [], []
+    per_thread = max(requests // concurrency, 1)
+    threads = [
+        threading.Thread(target=_worker, args=(path, headers, per_thread, latencies, queries, errors))
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = summarize(latencies, queries, wall_seconds=time.perf_counter() - start)
+    summary["errors"] = len(errors)
+    return summary
+
+
+def run(requests=200, concurrency=1, warmup=10, only=None):
+    """Return {endpoint name: summary} for every endpoint (or those named in ``only``)."""
+    user = bench_user()
+    token = str(UserClaimsRefreshToken.for_user(user).access_token)
+    product_id = Product.objects.filter(seller=user).values_list("id", flat=True).first()
+
+    results = {}
+    with fixed_rates():
+        for name, template, authenticated in ENDPOINTS:
+            if only and name not in only:
+                continue
+            path = template.format(product_id=product_id)
+            results[name] = run_endpoint(path, authenticated, token, requests, concurrency, warmup)
+    return results
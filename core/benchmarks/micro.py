@@ -0,0 +1,84 @@
+"""Serializer micro-benchmarks on seeded data."""
+import time
+from unittest import mock
+
+from django.db import connection
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from core.chat.models import Message
+from core.chat.serializers import ChatSerializer
+from core.product.models import Category, Product
+from core.product.serializers import CategorySerializer, ProductSerializer
+from core.utils.db import QueryCounter
+from core.utils.renderers import FastJSONRenderer
+from .report import summarize
+
+# Fixed conversion table so benchmarks never call the live rates API
+BENCH_RATES = {"ETB": 1, "USD": 0.0077, "AED": 0.0283}
+
+
+def fixed_rates():
+    return mock.patch("core.utils.currency.fetch_conversion_rates", return_value=dict(BENCH_RATES))
+
+
+def drf_request(path="/api/product/", **params):
+    return Request(RequestFactory().get(path, params))
+
+
+def measure(load, serialize, repeat):
+    """
+    Time ``serialize(load())`` repeat times (after one warm-up), counting queries per call.
+
+    Rows are reloaded outside the timer on every iteration so related-object caches
+    filled by a previous run can't hide the queries a real request would make.
+    """
+    serialize(load())
+    latencies, queries = [], []
+    for _ in range(repeat):
+        rows = load()
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            serialize(rows)
+            latencies.append(time.perf_counter() - start)
+        queries.append(counter.count)
+    return summarize(latencies, queries)
+
+
+def run(page_size=100, repeat=20):
+    """Return {benchmark name: summary} for the serializers on the hottest endpoints."""
+    def products():
+        return list(Product.objects.select_related("category", "city", "seller").order_by("-created_at")[:page_size])
+
+    def categories():
+        return list(Category.objects.all())
+
+    def messages():
+        return list(Message.objects.select_related("sender", "conversation")[:page_size])
+
+    if not Product.objects.exists():
+        raise ValueError("No products found; run seed_bench_data first.")
+
+    results = {}
+    with fixed_rates():
+        request = drf_request()
+        usd_request = drf_request(currency="USD")
+        results[f"ProductSerializer x{page_size}"] = measure(
+            products, lambda rows: ProductSerializer(rows, many=True, context={"request": request}).data, repeat
+        )
+        results[f"ProductSerializer x{page_size} USD"] = measure(
+            products, lambda rows: ProductSerializer(rows, many=True, context={"request": usd_request}).data, repeat
+        )
+        results["CategorySerializer all"] = measure(
+            categories, lambda rows: CategorySerializer(rows, many=True, context={"request": request}).data, repeat
+        )
+        results[f"ChatSerializer x{page_size}"] = measure(
+            messages, lambda rows: ChatSerializer(rows, many=True).data, repeat
+        )
+
+        # Encoding only: the serialized page is built once, outside the timer
+        page = ProductSerializer(products(), many=True, context={"request": usd_request}).data
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            results[f"{type(renderer).__name__} x{page_size}"] = measure(lambda: page, renderer.render, repeat)
+    return results
@@ -0,0 +1,79 @@
+"""Timing summaries and stored baselines shared by the benchmark commands."""
+import json
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.db import connection
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+
+def summarize(latencies, queries=None, wall_seconds=None):
+    """Reduce raw per-iteration seconds into millisecond percentiles."""
+    ordered = sorted(latencies)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ordered[0]
+    summary = {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+    }
+    if queries is not None:
+        summary["queries"] = round(statistics.fmean(queries), 2)
+    if wall_seconds:
+        summary["rps"] = round(len(ordered) / wall_seconds, 1)
+    return summary
+
+
+def environment():
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=False
+        ).stdout.strip()
+    except OSError:
+        revision = ""
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": revision,
+        "python": platform.python_version(),
+        "database": connection.vendor,
+    }
+
+
+def save_baseline(name, results, **meta):
+    BASELINE_DIR.mkdir(exist_ok=True)
+    path = BASELINE_DIR / f"{name}.json"
+    path.write_text(json.dumps({"environment": environment(), **meta, "results": results}, indent=2) + "\n")
+    return path
+
+
+def load_baseline(name):
+    return json.loads((BASELINE_DIR / f"{name}.json").read_text())["results"]
+
+
+DEFAULT_COLUMNS = ["p50_ms", "p95_ms", "p99_ms", "queries", "rps", "errors"]
+
+
+def format_table(results, baseline=None, columns=DEFAULT_COLUMNS):
+    """Render results (and % change of p50/p95 against a baseline) as aligned text rows."""
+    width = max([len(name) for name in results] + [10])
+    lines = [f"{'name':<{width}} " + " ".join(f"{column:>10}" for column in columns)]
+    for name, summary in results.items():
+        row = f"{name:<{width}} " + " ".join(f"{summary.get(column, ''):>10}" for column in columns)
+        previous = (baseline or {}).get(name)
+        if previous:
+            deltas = [
+                f"{column} {(summary[column] - previous[column]) / previous[column]:+.0%}"
+                for column in ("p50_ms", "p95_ms") if previous.get(column)
+            ]
+            row += "   vs baseline: " + ", ".join(deltas)
+        lines.append(row)
+    return "\n".join(lines)
@@ -0,0 +1,130 @@
+"""
+Out-of-process server benchmark: boots gunicorn in each worker mode with
+gunicorn.conf.py and drives the main endpoints over HTTP.
+
+Endpoints that convert prices are left out, so runs never depend on the live
+exchange-rate API.
+"""
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from django.conf import settings
+from core.product.models import Product
+from core.user.authentication import UserClaimsRefreshToken
+from .load import ENDPOINTS, bench_user
+from .report import summarize
+
+MODES = ('sync', 'gthread', 'gevent', 'uvicorn')
+MODE_PACKAGES = {'gevent': 'gevent', 'uvicorn': 'uvicorn'}
+SERVER_ENDPOINTS = [endpoint for endpoint in ENDPOINTS if 'currency=' not in endpoint[1]]
+BOOT_TIMEOUT = 60
+
+
+def missing_package(mode):
+    package = MODE_PACKAGES.get(mode)
+    return package if package and importlib.util.find_spec(package) is None else None
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(mode, workers, threads):
+    """Run gunicorn in ``mode`` against the benchmark settings; yields its base URL."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings_bench'),
+        'GUNICORN_WORKER_CLASS': mode,
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_THREADS': str(threads),
+    }
+    url = f'http://127.0.0.1:{port}'
+    with tempfile.TemporaryFile() as log:
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+            cwd=settings.BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        try:
+            _wait_until_up(url, process, log)
+            yield url
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def _wait_until_up(url, process, log):
+    deadline = time.monotonic() + BOOT_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"gunicorn exited with {process.returncode}:\n{log.read().decode()[-2000:]}")
+        try:
+            requests.get(f'{url}/api/product/categories/', timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"gunicorn did not answer within {BOOT_TIMEOUT}s")
+
+
+def _worker(url, headers, count, latencies, errors):
+    with requests.Session() as session:
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                response = session.get(url, headers=headers, timeout=30)
+            except requests.RequestException:
+                errors.append(None)
+                continue
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+
+
+def drive(url, headers, requests_total=200, concurrency=8, warmup=10):
+    _worker(url, headers, warmup, [], [])
+
+    latencies, errors = [], []
+    per_thread = max(requests_total // concurrency, 1)
+    threads = [
+        threading.Thread(target=_worker, args=(url, headers, per_thread, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = summarize(latencies or [0.0], wall_seconds=time.perf_counter() - start)
+    summary["errors"] = len(errors)
+    return summary
+
+
+def run(modes=MODES, workers=2, threads=4, requests_total=200, concurrency=8, warmup=10, only=None):
+    """Return {"<mode> <endpoint>": summary} for each mode and endpoint."""
+    user = bench_user()
+    token = str(UserClaimsRefreshToken.for_user(user).access_token)
+    product_id = Product.objects.filter(seller=user).values_list("id", flat=True).first()
+
+    results = {}
+    for mode in modes:
+        with serve(mode, workers, threads) as base_url:
+            for name, template, authenticated in SERVER_ENDPOINTS:
+                if only and name not in only:
+                    continue
+                headers = {"Authorization": f"Bearer {token}"} if authenticated else {}
+                url = base_url + template.format(product_id=product_id)
+                results[f"{mode} {name}"] = drive(url, headers, requests_total, concurrency, warmup)
+    return results
@@ -0,0 +1,98 @@
+"""
+Cold-start measurements. Each sample is a fresh interpreter that runs
+django.setup() and loads the URLconf under ``python -X importtime``: what a
+management command or a freshly spawned worker pays before its first request.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from .report import summarize
+
+# HTTP clients the project imports on first use; its own modules must not load them at
+# startup. (DRF's compat module imports requests whenever it's installed, which we can't avoid.)
+LAZY_IMPORTS = ('requests', 'httpx')
+PROJECT_PACKAGES = ('core', 'config')
+
+PROBE = """
+import builtins, json, resource, sys, time
+lazy, importers, _import = %r, {}, builtins.__import__
+
+def recording_import(name, globals=None, locals=None, fromlist=(), level=0):
+    top = name.partition('.')[0]
+    if not level and top in lazy and top not in sys.modules and top not in importers:
+        importers[top] = (globals or {}).get('__name__', '?')
+    return _import(name, globals, locals, fromlist, level)
+
+builtins.__import__ = recording_import
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - start
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    "setup": setup,
+    "urlconf": time.perf_counter() - start - setup,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "importers": importers,
+}))
+""" % (LAZY_IMPORTS,)
+
+
+def project_eager_imports(importers):
+    """Return the LAZY_IMPORTS that project code (rather than a dependency) loaded at startup."""
+    return sorted(
+        name for name, importer in importers.items() if importer.partition('.')[0] in PROJECT_PACKAGES
+    )
+
+
+def import_costs(importtime_output):
+    """Sum ``-X importtime`` self times (microseconds) per top-level package."""
+    costs = Counter()
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, _, name = line.replace("|", ":", 2).split(":", 3)
+        costs[name.strip().split(".")[0]] += int(self_us)
+    return costs
+
+
+def sample():
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings")}
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if process.returncode:
+        raise RuntimeError(f"Startup probe failed:\n{process.stderr[-2000:]}")
+    return json.loads(process.stdout.strip().splitlines()[-1]), import_costs(process.stderr)
+
+
+def run(samples=5):
+    """
+    Return ({phase: summary}, peak RSS in MB, median import self-time per package in ms,
+    LAZY_IMPORTS that project code loaded during startup).
+    """
+    timings, rss, costs, eager = {"setup": [], "urlconf": [], "total": []}, [], [], set()
+    for _ in range(samples):
+        measured, package_costs = sample()
+        timings["setup"].append(measured["setup"])
+        timings["urlconf"].append(measured["urlconf"])
+        timings["total"].append(measured["setup"] + measured["urlconf"])
+        rss.append(measured["rss_mb"])
+        costs.append(package_costs)
+        eager.update(project_eager_imports(measured["importers"]))
+
+    packages = set().union(*costs)
+    by_package = {
+        package: round(statistics.median(sample_costs.get(package, 0) for sample_costs in costs) / 1000, 1)
+        for package in packages
+    }
+    results = {f"startup {phase}": summarize(values) for phase, values in timings.items()}
+    by_package = dict(sorted(by_package.items(), key=lambda item: -item[1]))
+    return results, round(max(rss), 1), by_package, sorted(eager)
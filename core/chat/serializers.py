@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from core.product.models import Product
 from .models import Conversation, Message
 
 User = get_user_model()
@@ -25,6 +26,7 @@ class StartConversationSerializer(serializers.Serializer):
     """Serializer for starting a new conversation."""
     
     receiver_id = serializers.IntegerField()
+    product_id = serializers.IntegerField(required=False)  # Listing the conversation was started from
 
     def validate_receiver_id(self, value):
         """Ensure the receiver exists and is not the sender."""
@@ -37,6 +39,13 @@ class StartConversationSerializer(serializers.Serializer):
         
         return value
 
+    def validate(self, attrs):
+        """Ensure a referenced product is listed by the receiver."""
+        product_id = attrs.get("product_id")
+        if product_id is not None and not Product.objects.filter(id=product_id, seller_id=attrs["receiver_id"]).exists():
+            raise serializers.ValidationError({"product_id": "Product does not exist or isn't sold by the receiver."})
+        return attrs
+
     def create(self, validated_data):
         """Create or get an existing one-to-one conversation."""
         sender = self.context["request"].user
@@ -45,6 +54,10 @@ class StartConversationSerializer(serializers.Serializer):
         conversation, created = Conversation.objects.get_or_create(
             sender=sender, receiver=receiver
         )
+
+        # Conversations are per buyer/seller pair, so only a new one counts as an inquiry
+        if created and validated_data.get("product_id") is not None:
+            Product.objects.increment(validated_data["product_id"], inquiry_count=1)
         
         return conversation
 
@@ -1,3 +1,42 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from core.product.models import Product
+from core.user.models import User
+from core.utils.cache import cache
+from core.utils.conditional import get_version, model_scope
 
-# Create your tests here.
+
+class InquiryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create_user(email="seller@example.com", password="pass12345")
+        self.buyer = User.objects.create_user(email="buyer@example.com", password="pass12345")
+        self.product = Product.objects.create(
+            title="Bike", description="Used", price="50.00", owner=self.seller, seller=self.seller,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def start(self):
+        data = {'receiver_id': self.seller.pk, 'product_id': self.product.pk}
+        return self.client.post('/api/chat/conversations/', data, format='json')
+
+    def test_new_conversation_counts_one_inquiry_and_bumps_the_product(self):
+        version = get_version(model_scope(Product, self.product.pk))
+        self.assertEqual(self.start().status_code, 201)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.inquiry_count, 1)
+        self.assertNotEqual(get_version(model_scope(Product, self.product.pk)), version)
+
+    def test_existing_conversation_is_not_counted_again(self):
+        self.start()
+        self.start()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.inquiry_count, 1)
+
+    def test_product_must_be_sold_by_the_receiver(self):
+        other = User.objects.create_user(email="other@example.com", password="pass12345")
+        response = self.client.post(
+            '/api/chat/conversations/', {'receiver_id': other.pk, 'product_id': self.product.pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
@@ -2,6 +2,7 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.db.models import Q
+from core.utils.replicas import ReadReplicaMixin
 from .models import Conversation, Message
 from .serializers import ConversationSerializer, ChatSerializer, StartConversationSerializer
 
@@ -9,6 +10,7 @@ class ConversationViewSet(viewsets.ViewSet):
     """ViewSet for managing one-on-one conversations."""
     
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scopes = {'create': 'chat'}
 
     def list(self, request):
         """Get all conversations for the authenticated user."""
@@ -37,11 +39,12 @@ class ConversationViewSet(viewsets.ViewSet):
         serializer = ConversationSerializer(conversation)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-class ChatViewSet(viewsets.ModelViewSet):
+class ChatViewSet(ReadReplicaMixin, viewsets.ModelViewSet):
     """ViewSet for managing chat messages."""
     
     serializer_class = ChatSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scopes = {'create': 'chat'}
 
     def get_queryset(self):
         """Filter messages to only those in conversations involving the user."""
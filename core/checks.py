@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.checks import Error, Tags, register
+
+# Backends whose add() and incr() are atomic across processes
+ATOMIC_CACHE_BACKENDS = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache_is_atomic(app_configs, **kwargs):
+    """Cache locks and rate limits only hold on a backend with atomic add()."""
+    backend = caches['default']
+    alias = 'shared' if hasattr(backend, 'shared') else 'default'
+    path = settings.CACHES[alias]['BACKEND']
+    if path in ATOMIC_CACHE_BACKENDS:
+        return []
+    return [
+        Error(
+            f"The shared cache ({path}) has no atomic add(); cache-fill locks, rate limits "
+            "and replica pins can be raced between workers.",
+            hint="Set CACHE_URL to a redis:// (or pymemcache://) URL.",
+            id='core.E001',
+        )
+    ]
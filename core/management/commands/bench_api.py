@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmarks import load, report
+
+
+class Command(BaseCommand):
+    help = "Drive the main API endpoints in-process and report latency percentiles, queries and throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Measured requests per endpoint.")
+        parser.add_argument('--concurrency', type=int, default=1, help="Client threads per endpoint.")
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--only', nargs='*', help="Endpoint names to run (default: all).")
+        parser.add_argument('--baseline', help="Compare against baselines/api-<name>.json.")
+        parser.add_argument('--save-baseline', help="Store results as baselines/api-<name>.json.")
+
+    def handle(self, *args, **options):
+        try:
+            results = load.run(
+                requests=options['requests'], concurrency=options['concurrency'],
+                warmup=options['warmup'], only=options['only'],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+
+        baseline = report.load_baseline(f"api-{options['baseline']}") if options['baseline'] else None
+        self.stdout.write(report.format_table(results, baseline))
+        if options['save_baseline']:
+            path = report.save_baseline(
+                f"api-{options['save_baseline']}", results,
+                requests=options['requests'], concurrency=options['concurrency'],
+            )
+            self.stdout.write(f"Saved baseline to {path}")
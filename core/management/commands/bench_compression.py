@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmarks import compression, report
+
+
+class Command(BaseCommand):
+    help = "Compare compression time and size of real API payloads for each gzip level and brotli quality."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--baseline', help="Compare against baselines/compression-<name>.json.")
+        parser.add_argument('--save-baseline', help="Store results as baselines/compression-<name>.json.")
+
+    def handle(self, *args, **options):
+        if compression.compression.brotli is None:
+            self.stderr.write("brotli is not installed; measuring gzip only")
+        try:
+            results = compression.run(page_size=options['page_size'], repeat=options['repeat'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        baseline = report.load_baseline(f"compression-{options['baseline']}") if options['baseline'] else None
+        self.stdout.write(report.format_table(results, baseline, columns=compression.COLUMNS))
+        if options['save_baseline']:
+            path = report.save_baseline(
+                f"compression-{options['save_baseline']}", results,
+                page_size=options['page_size'], repeat=options['repeat'],
+            )
+            self.stdout.write(f"Saved baseline to {path}")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmarks import micro, report
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark the Product, Category and Chat serializers on seeded data."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--baseline', help="Compare against baselines/serializers-<name>.json.")
+        parser.add_argument('--save-baseline', help="Store results as baselines/serializers-<name>.json.")
+
+    def handle(self, *args, **options):
+        try:
+            results = micro.run(page_size=options['page_size'], repeat=options['repeat'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        baseline = report.load_baseline(f"serializers-{options['baseline']}") if options['baseline'] else None
+        self.stdout.write(report.format_table(results, baseline))
+        if options['save_baseline']:
+            path = report.save_baseline(
+                f"serializers-{options['save_baseline']}", results,
+                page_size=options['page_size'], repeat=options['repeat'],
+            )
+            self.stdout.write(f"Saved baseline to {path}")
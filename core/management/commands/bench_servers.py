@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmarks import report, servers
+
+
+class Command(BaseCommand):
+    help = "Boot gunicorn in each worker mode and compare latency and throughput of the main endpoints over HTTP."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='*', choices=servers.MODES, default=list(servers.MODES))
+        parser.add_argument('--workers', type=int, default=2, help="Gunicorn worker processes per mode.")
+        parser.add_argument('--threads', type=int, default=4, help="Threads per gthread worker.")
+        parser.add_argument('--requests', type=int, default=200, help="Measured requests per endpoint.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Client threads per endpoint.")
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--only', nargs='*', help="Endpoint names to run (default: all).")
+        parser.add_argument('--baseline', help="Compare against baselines/servers-<name>.json.")
+        parser.add_argument('--save-baseline', help="Store results as baselines/servers-<name>.json.")
+
+    def handle(self, *args, **options):
+        modes = []
+        for mode in options['modes']:
+            package = servers.missing_package(mode)
+            if package:
+                self.stderr.write(f"Skipping {mode}: {package} is not installed")
+            else:
+                modes.append(mode)
+
+        try:
+            results = servers.run(
+                modes=modes, workers=options['workers'], threads=options['threads'],
+                requests_total=options['requests'], concurrency=options['concurrency'],
+                warmup=options['warmup'], only=options['only'],
+            )
+        except (ValueError, RuntimeError) as e:
+            raise CommandError(e)
+
+        baseline = report.load_baseline(f"servers-{options['baseline']}") if options['baseline'] else None
+        self.stdout.write(report.format_table(results, baseline))
+        if options['save_baseline']:
+            path = report.save_baseline(
+                f"servers-{options['save_baseline']}", results, modes=modes, workers=options['workers'],
+                threads=options['threads'], requests=options['requests'], concurrency=options['concurrency'],
+            )
+            self.stdout.write(f"Saved baseline to {path}")
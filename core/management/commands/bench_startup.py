@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmarks import report, startup
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start (django.setup() plus URLconf import) and per-process RSS in fresh "
+        "interpreters, list the slowest imports, and fail when limits are exceeded or a lazily "
+        "imported client is loaded at startup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=5, help="Fresh interpreters to start.")
+        parser.add_argument('--top', type=int, default=15, help="Packages to list by import time.")
+        parser.add_argument('--max-ms', type=float, help="Fail if the median total startup exceeds this.")
+        parser.add_argument('--max-rss-mb', type=float, help="Fail if peak RSS after startup exceeds this.")
+        parser.add_argument('--baseline', help="Compare against baselines/startup-<name>.json.")
+        parser.add_argument('--save-baseline', help="Store results as baselines/startup-<name>.json.")
+
+    def handle(self, *args, **options):
+        try:
+            results, rss_mb, imports, eager = startup.run(samples=options['samples'])
+        except RuntimeError as e:
+            raise CommandError(e)
+
+        baseline = report.load_baseline(f"startup-{options['baseline']}") if options['baseline'] else None
+        self.stdout.write(report.format_table(results, baseline))
+        self.stdout.write(f"\npeak RSS: {rss_mb} MB\n\nimport time by package (ms, self):")
+        for package, ms in list(imports.items())[:options['top']]:
+            self.stdout.write(f"  {package:<30} {ms:>8}")
+
+        if options['save_baseline']:
+            path = report.save_baseline(
+                f"startup-{options['save_baseline']}", results, samples=options['samples'], rss_mb=rss_mb,
+            )
+            self.stdout.write(f"Saved baseline to {path}")
+
+        total_ms = results["startup total"]["p50_ms"]
+        failures = [f"{name} is imported at startup by project code" for name in eager]
+        if options['max_ms'] is not None and total_ms > options['max_ms']:
+            failures.append(f"startup took {total_ms} ms (limit {options['max_ms']} ms)")
+        if options['max_rss_mb'] is not None and rss_mb > options['max_rss_mb']:
+            failures.append(f"RSS reached {rss_mb} MB (limit {options['max_rss_mb']} MB)")
+        if failures:
+            raise CommandError("; ".join(failures))
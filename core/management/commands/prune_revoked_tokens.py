@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from core.user.revocation import prune
+
+
+class Command(BaseCommand):
+    help = "Delete revoked refresh tokens that have expired and no longer need to be tracked."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Pruned {prune()} expired revoked tokens.")
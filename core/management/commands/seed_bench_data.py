@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from core.benchmarks import datagen
+
+
+class Command(BaseCommand):
+    help = "Seed a reproducible benchmark dataset (users, category tree, cities, products, favorites, carts, chats)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--categories', type=int, default=40)
+        parser.add_argument('--depth', type=int, default=3, help="Levels in the category tree.")
+        parser.add_argument('--cities', type=int, default=30)
+        parser.add_argument('--products', type=int, default=2000)
+        parser.add_argument('--favorites', type=int, default=10, help="Favorites per user.")
+        parser.add_argument('--cart-items', type=int, default=3, help="Cart items per user.")
+        parser.add_argument('--conversations', type=int, default=300)
+        parser.add_argument('--messages', type=int, default=10, help="Messages per conversation.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true', help="Don't remove a previous benchmark dataset first.")
+
+    def handle(self, *args, **options):
+        if not options['keep']:
+            datagen.flush()
+        counts = datagen.seed(
+            users=options['users'], categories=options['categories'], depth=options['depth'],
+            cities=options['cities'], products=options['products'], favorites=options['favorites'],
+            cart_items=options['cart_items'], conversations=options['conversations'],
+            messages=options['messages'], seed=options['seed'],
+        )
+        for model, count in counts.items():
+            self.stdout.write(f"{model:>14}: {count}")
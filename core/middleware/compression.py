@@ -0,0 +1,212 @@
+"""
+Negotiated response compression.
+
+Responses whose content type is listed in COMPRESSION_LEVELS are compressed with
+brotli (when installed and accepted) or gzip, at that type's level; anything
+else, such as images and other already-compressed media, is sent as is. Bodies
+smaller than COMPRESSION_MIN_SIZE aren't worth the CPU and are left alone.
+Streaming responses are compressed chunk by chunk.
+
+BREACH: a compressed body's length can reveal a secret in it to an attacker who
+can also inject text into it. Like Django's GZipMiddleware, gzip output gets a
+random-length file name (up to COMPRESSION_MAX_RANDOM_BYTES) in its header, so
+lengths can't be compared across requests. Brotli has no such field, so it is
+only used for requests without credentials (no Authorization or Cookie header)
+whose responses set no cookies; everything else is sent with padded gzip.
+"""
+import secrets
+import struct
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from core.utils.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip is always available
+    brotli = None
+
+BYTES_IN = registry.counter(
+    'http_compression_input_bytes_total', 'Response bytes before compression, by encoding.', ('encoding',)
+)
+BYTES_OUT = registry.counter(
+    'http_compression_output_bytes_total', 'Response bytes after compression, by encoding.', ('encoding',)
+)
+
+
+def accepted_encodings(header):
+    """Return {coding: q} from an Accept-Encoding header; ``*`` stands for any other coding."""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip() == 'q':
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def may_hold_secrets(request, response):
+    """Whether a response may carry per-user data, such as tokens, worth a BREACH attack."""
+    return bool(response.cookies or request.headers.get('Authorization') or request.headers.get('Cookie'))
+
+
+def choose_encoding(header, allow_brotli=True):
+    """Pick 'br' or 'gzip' for an Accept-Encoding header, or None to send identity."""
+    accepted = accepted_encodings(header)
+    available = ('br', 'gzip') if brotli is not None and allow_brotli else ('gzip',)
+    best, best_q = None, 0.0
+    for coding in available:  # Ties keep the earlier, better-compressing coding
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(data, encoding, level, max_random_bytes=0):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    process, finish = compressor(encoding, level, max_random_bytes)
+    return process(data) + finish()
+
+
+class GzipStream:
+    """
+    Incremental gzip writer whose header carries a random-length file name.
+
+    zlib only writes gzip headers without one, so this frames raw deflate output
+    itself: header, deflate stream, then CRC-32 and length (RFC 1952).
+    """
+
+    def __init__(self, level, max_random_bytes=0):
+        self._deflate = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._crc = self._size = 0
+        flags, name = 0, b''
+        if max_random_bytes:
+            # 1 to max_random_bytes hex digits, NUL-terminated (FNAME flag)
+            flags = 0x08
+            name = secrets.token_hex(max_random_bytes)[:secrets.randbelow(max_random_bytes) + 1].encode() + b'\x00'
+        # Magic, deflate, flags, zero mtime, no extra flags, unknown OS
+        self._header = b'\x1f\x8b\x08' + bytes([flags]) + b'\x00\x00\x00\x00\x00\xff' + name
+
+    def process(self, data):
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        header, self._header = self._header, b''
+        return header + self._deflate.compress(data)
+
+    def finish(self):
+        header, self._header = self._header, b''
+        trailer = struct.pack('<II', self._crc, self._size & 0xFFFFFFFF)
+        return header + self._deflate.flush() + trailer
+
+
+def compressor(encoding, level, max_random_bytes=0):
+    """Return (compress chunk, finish) callables for incremental compression."""
+    if encoding == 'br':
+        stream = brotli.Compressor(quality=level)
+        return stream.process, stream.finish
+    stream = GzipStream(level, max_random_bytes)
+    return stream.process, stream.finish
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def levels_for(self, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        return settings.COMPRESSION_LEVELS.get(content_type)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or request.method == 'HEAD':
+            return response
+        levels = self.levels_for(response)
+        if levels is None:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        encoding = choose_encoding(
+            request.headers.get('Accept-Encoding', ''), allow_brotli=not may_hold_secrets(request, response)
+        )
+        if encoding is None:
+            return response
+        level = levels[0] if encoding == 'br' else levels[1]
+        padding = settings.COMPRESSION_MAX_RANDOM_BYTES
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._acompress_stream(
+                    response.streaming_content, encoding, level, padding
+                )
+            else:
+                response.streaming_content = self._compress_stream(
+                    response.streaming_content, encoding, level, padding
+                )
+            del response['Content-Length']
+        else:
+            original = response.content
+            response.content = compress(original, encoding, level, padding)
+            BYTES_IN.inc(len(original), encoding=encoding)
+            BYTES_OUT.inc(len(response.content), encoding=encoding)
+            response['Content-Length'] = str(len(response.content))
+
+        # The compressed body differs byte for byte, so a strong validator must become weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def _compress_stream(self, chunks, encoding, level, max_random_bytes):
+        process, finish = compressor(encoding, level, max_random_bytes)
+        size_in = size_out = 0
+        for chunk in chunks:
+            size_in += len(chunk)
+            data = process(chunk)
+            if data:
+                size_out += len(data)
+                yield data
+        data = finish()
+        size_out += len(data)
+        yield data
+        BYTES_IN.inc(size_in, encoding=encoding)
+        BYTES_OUT.inc(size_out, encoding=encoding)
+
+    async def _acompress_stream(self, chunks, encoding, level, max_random_bytes):
+        process, finish = compressor(encoding, level, max_random_bytes)
+        size_in = size_out = 0
+        async for chunk in chunks:
+            size_in += len(chunk)
+            data = process(chunk)
+            if data:
+                size_out += len(data)
+                yield data
+        data = finish()
+        size_out += len(data)
+        yield data
+        BYTES_IN.inc(size_in, encoding=encoding)
+        BYTES_OUT.inc(size_out, encoding=encoding)
@@ -0,0 +1,77 @@
+import os
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from core.utils.db import QueryCounter
+from core.utils.metrics import registry
+
+REQUESTS = registry.counter(
+    'http_requests_total', 'HTTP requests served, by route, method and status.', ('route', 'method', 'status')
+)
+LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'Request wall time, by route and method.', ('route', 'method')
+)
+QUERIES = registry.histogram(
+    'http_request_db_queries', 'Database queries per request, by route.', ('route',),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+IN_FLIGHT = registry.gauge('http_requests_in_flight', 'Requests currently being served, per worker.', ('pid',))
+
+
+def route_name(request):
+    """Low-cardinality route label: the resolved view name rather than the raw path."""
+    match = getattr(request, 'resolver_match', None)
+    return (match.view_name or match.route) if match else 'unmatched'
+
+
+class MetricsMiddleware:
+    """Record per-route request counts, latency and query counts, plus the in-flight gauge."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pid = str(os.getpid())
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        counter = QueryCounter()
+        IN_FLIGHT.inc(pid=self.pid)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = self.get_response(request)
+        finally:
+            IN_FLIGHT.dec(pid=self.pid)
+
+        self._observe(request, response, time.perf_counter() - start, counter.count)
+        return response
+
+    async def __acall__(self, request):
+        # Async views query from executor threads, so queries aren't counted here
+        IN_FLIGHT.inc(pid=self.pid)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            IN_FLIGHT.dec(pid=self.pid)
+
+        self._observe(request, response, time.perf_counter() - start, None)
+        return response
+
+    def _observe(self, request, response, elapsed, queries):
+        route = route_name(request)
+        REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        LATENCY.observe(elapsed, route=route, method=request.method)
+        if queries is not None:
+            QUERIES.observe(queries, route=route)
+        registry.maybe_flush()
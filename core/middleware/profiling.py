@@ -0,0 +1,173 @@
+import logging
+import os
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.utils.crypto import constant_time_compare
+from core.utils import profiling
+
+logger = logging.getLogger('core.slow_requests')
+
+
+class ProfilingMiddleware:
+    """
+    Break request wall time down into DB, cache, outbound HTTP, app and render phases.
+
+    A request is profiled when it carries an ``X-Profile`` header matching
+    PROFILING_TOKEN (any value in DEBUG with PROFILING_ENABLED and no token set) or
+    is picked by PROFILING_SAMPLE_RATE. Profiled responses get a ``Server-Timing``
+    header. Every request slower than PROFILING_SLOW_MS is logged; profiled ones
+    also carry their phase breakdown and most expensive SQL statements. Sending
+    ``X-Profile-Dump: cprofile`` (or ``pyinstrument`` when installed) with a valid
+    token also writes a profiler dump to PROFILING_DUMP_DIR.
+
+    Under ASGI, async views run their queries in executor threads whose connections
+    aren't wrapped, so only cache and HTTP time is attributed for them.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        requested = self._requested(request)
+        if not requested and random.random() >= settings.PROFILING_SAMPLE_RATE:
+            start = time.perf_counter()
+            response = self.get_response(request)
+            self._log_if_slow(request, response, time.perf_counter() - start)
+            return response
+
+        profile = profiling.RequestProfile()
+        request._profile = profile
+        token = profiling.activate(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self._time_query))
+                dump = request.headers.get('X-Profile-Dump') if requested else None
+                response = self._profiled_call(request, dump)
+        finally:
+            profiling.deactivate(token)
+
+        self._finish(request, response, profile)
+        return response
+
+    async def __acall__(self, request):
+        if not self._requested(request) and random.random() >= settings.PROFILING_SAMPLE_RATE:
+            start = time.perf_counter()
+            response = await self.get_response(request)
+            self._log_if_slow(request, response, time.perf_counter() - start)
+            return response
+
+        profile = profiling.RequestProfile()
+        request._profile = profile
+        token = profiling.activate(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiling.deactivate(token)
+
+        self._finish(request, response, profile)
+        return response
+
+    def process_template_response(self, request, response):
+        # Runs after the view returns and before the response is rendered
+        profile = getattr(request, '_profile', None)
+        if profile is not None:
+            profile.view_finished = time.perf_counter()
+        return response
+
+    def _requested(self, request):
+        value = request.headers.get('X-Profile')
+        if not value:
+            return False
+        if settings.PROFILING_TOKEN:
+            return constant_time_compare(value, settings.PROFILING_TOKEN)
+        return settings.DEBUG and settings.PROFILING_ENABLED
+
+    def _time_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            profile = profiling.current_profile()
+            if profile is not None:
+                profile.add_query(sql, time.perf_counter() - start)
+
+    def _profiled_call(self, request, dump):
+        if dump == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                dump = 'cprofile'
+            else:
+                profiler = Profiler()
+                profiler.start()
+                try:
+                    return self.get_response(request)
+                finally:
+                    profiler.stop()
+                    self._write_dump(request, 'html', profiler.output_html().encode())
+
+        if dump == 'cprofile':
+            import cProfile
+            import marshal
+
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(self.get_response, request)
+            finally:
+                profiler.create_stats()
+                self._write_dump(request, 'prof', marshal.dumps(profiler.stats))
+
+        return self.get_response(request)
+
+    def _write_dump(self, request, extension, content):
+        os.makedirs(settings.PROFILING_DUMP_DIR, exist_ok=True)
+        name = f"{int(time.time())}-{request.method}-{request.path.strip('/').replace('/', '_') or 'root'}.{extension}"
+        path = os.path.join(settings.PROFILING_DUMP_DIR, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        logger.info("Wrote profile dump %s", path)
+
+    def _finish(self, request, response, profile):
+        now = time.perf_counter()
+        total = now - profile.started
+        phases = profile.summary()
+        render = now - profile.view_finished if profile.view_finished is not None else 0.0
+        io = sum(entry['seconds'] for phase, entry in profile.phases.items() if phase in ('db', 'cache', 'http'))
+        # Python time outside I/O and rendering: view code, serializers and middleware
+        phases['app'] = {'ms': round(max(total - io - render, 0) * 1000, 2), 'count': 1}
+        phases['render'] = {'ms': round(render * 1000, 2), 'count': 1}
+
+        response['Server-Timing'] = ", ".join(
+            [f"{phase};dur={entry['ms']}" for phase, entry in phases.items()]
+            + [f"total;dur={round(total * 1000, 2)}"]
+        )
+
+        self._log_if_slow(request, response, total, profile, phases)
+
+    def _log_if_slow(self, request, response, total, profile=None, phases=None):
+        """Log a slow_request warning; unprofiled requests only know their wall time."""
+        if total * 1000 < settings.PROFILING_SLOW_MS:
+            return
+        extra = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+        }
+        if profile is not None:
+            extra.update(phases=phases, top_sql=profile.top_statements())
+        logger.warning('slow_request', extra=extra)
@@ -0,0 +1,46 @@
+import re
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from core.utils import log
+
+# Accept ids from a trusted proxy, but don't let clients inject arbitrary text into logs
+VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+class RequestIdMiddleware:
+    """Tag the request, its log records and the response with an ``X-Request-ID``."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = self._activate(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            log.reset_request_id(token)
+        response['X-Request-ID'] = request.request_id
+        return response
+
+    async def __acall__(self, request):
+        token = self._activate(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            log.reset_request_id(token)
+        response['X-Request-ID'] = request.request_id
+        return response
+
+    def _activate(self, request):
+        incoming = request.headers.get('X-Request-ID', '')
+        request.request_id = incoming if VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        return log.set_request_id(request.request_id)
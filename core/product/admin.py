@@ -5,7 +5,7 @@ class CategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'icon', 'image']
 
 class CityAdmin(admin.ModelAdmin):
-    list_display = ['name', 'region']  # Display city name and region in the admin panel
+    list_display = ['name', 'region', 'latitude', 'longitude']  # Display city name and region in the admin panel
     search_fields = ['name', 'region']  # Allow searching by name or region
 
 # class ProductAdmin(admin.ModelAdmin):
@@ -5,3 +5,6 @@ class ProductConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core.product'
     # label = 'core_product'
+
+    def ready(self):
+        from . import signals  # noqa: F401
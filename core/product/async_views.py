@@ -0,0 +1,185 @@
+"""
+ASGI-native read endpoints for the hottest catalog paths.
+
+These mirror the list/detail responses of ProductViewSet, CategoryViewSet and
+CityViewSet, but fetch rows with Django's async ORM and resolve exchange rates with
+an async HTTP client, so under uvicorn a worker keeps serving other requests while
+one waits on the database or the rates API. Serializers run inline on fully
+preloaded objects, so they never touch the database from the event loop.
+"""
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from core.user.authentication import ClaimsJWTAuthentication
+from core.utils.currency import afetch_live_exchange_rate
+from core.utils.renderers import dumps
+from .facets import product_facets, wants_facets
+from .models import Category, City, Product
+from .serializers import CategorySerializer, CitySerializer, ProductSerializer
+from .tracking import record_view
+from .views import ProductFilter, ProductPagination
+
+PRODUCT_ORDERING_FIELDS = {'price', 'created_at', 'favorites_count', 'view_count', 'inquiry_count'}
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+async def authentication_error(request):
+    """Run JWT authentication off the event loop; returns a 401 response if it fails."""
+    try:
+        result = await sync_to_async(ClaimsJWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as e:
+        return json_response({"detail": e.detail}, status=401)
+    if result is None:
+        return json_response({"detail": "Authentication credentials were not provided."}, status=401)
+    request.user = result[0]
+    return None
+
+
+async def paginate(request, queryset, page_size, page_size_query_param=None, max_page_size=None):
+    """Return (count, rows, next_url, previous_url) for PageNumberPagination-style params."""
+    if page_size_query_param and request.GET.get(page_size_query_param, '').isdigit():
+        page_size = min(int(request.GET[page_size_query_param]) or page_size, max_page_size or page_size)
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    count = await queryset.acount()
+    offset = (page - 1) * page_size
+    rows = [row async for row in queryset[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page + 1) if offset + page_size < count else None
+    if page <= 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page - 1)
+    return count, rows, next_url, previous_url
+
+
+async def category_children():
+    """Load the whole category tree in one query as {parent_id: [children]}."""
+    children = {}
+    async for category in Category.objects.all():
+        children.setdefault(category.parent_id, []).append(category)
+    return children
+
+
+async def product_context(request):
+    drf_request = Request(request)
+    context = {'request': drf_request, 'category_children': await category_children()}
+    target_currency = request.GET.get('currency')
+    if target_currency:
+        context['exchange_rates'] = {target_currency: await afetch_live_exchange_rate(target_currency)}
+    return context
+
+
+def product_queryset(request):
+    queryset = Product.objects.select_related('category', 'city', 'seller').with_favorites(request.user)
+    filterset = ProductFilter(request.GET, queryset=queryset)
+    if not filterset.is_valid():  # As DjangoFilterBackend does; .qs would drop invalid filters silently
+        raise ValidationError(filterset.errors)
+    queryset = filterset.qs
+
+    search = request.GET.get('search')
+    if search:
+        queryset = queryset.filter(Q(title__icontains=search) | Q(description__icontains=search))
+
+    ordering = request.GET.get('ordering', '-created_at')
+    if ordering.lstrip('-') not in PRODUCT_ORDERING_FIELDS:
+        ordering = '-created_at'
+    return queryset.order_by(ordering)
+
+
+@require_GET
+async def product_list(request):
+    error = await authentication_error(request)
+    if error is not None:
+        return error
+
+    # Filters may consult the cache and database (e.g. the region map), so build it off the loop
+    try:
+        queryset = await sync_to_async(product_queryset)(request)
+    except ValidationError as e:  # e.g. ?near=abc, a 400 from ProductViewSet too
+        return json_response(e.detail, status=400)
+    count, products, next_url, previous_url = await paginate(
+        request, queryset, ProductPagination.page_size,
+        ProductPagination.page_size_query_param, ProductPagination.max_page_size,
+    )
+    context = await product_context(request)
+    data = {
+        "count": count,
+        "next": next_url,
+        "previous": previous_url,
+        "results": ProductSerializer(products, many=True, context=context).data,
+    }
+    if wants_facets(request.GET):
+        data["facets"] = await sync_to_async(product_facets)(request.GET, queryset)
+    return json_response(data)
+
+
+@require_GET
+async def product_detail(request, pk):
+    error = await authentication_error(request)
+    if error is not None:
+        return error
+
+    try:
+        product = await (
+            Product.objects.select_related('category', 'city', 'seller').with_favorites(request.user).aget(pk=pk)
+        )
+    except Product.DoesNotExist:
+        return json_response({"detail": "No Product matches the given query."}, status=404)
+
+    record_view(pk)
+    context = await product_context(request)
+    return json_response(ProductSerializer(product, context=context).data)
+
+
+@require_GET
+async def category_list(request):
+    children = await category_children()
+    queryset = Category.objects.all()
+    name = request.GET.get('name')
+    if name:
+        queryset = queryset.filter(name=name)
+    search = request.GET.get('search')
+    if search:
+        queryset = queryset.filter(name__icontains=search)
+    if request.GET.get('ordering') in ('name', '-name'):
+        queryset = queryset.order_by(request.GET['ordering'])
+
+    count, categories, next_url, previous_url = await paginate(request, queryset, api_settings.PAGE_SIZE)
+    context = {'request': Request(request), 'category_children': children}
+    return json_response({
+        "count": count,
+        "next": next_url,
+        "previous": previous_url,
+        "results": CategorySerializer(categories, many=True, context=context).data,
+    })
+
+
+@require_GET
+async def city_list(request):
+    queryset = City.objects.order_by('pk')
+    for field in ('name', 'region'):
+        if request.GET.get(field):
+            queryset = queryset.filter(**{field: request.GET[field]})
+
+    count, cities, next_url, previous_url = await paginate(request, queryset, api_settings.PAGE_SIZE)
+    return json_response({
+        "count": count,
+        "next": next_url,
+        "previous": previous_url,
+        "results": CitySerializer(cities, many=True).data,
+    })
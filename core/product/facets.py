@@ -0,0 +1,118 @@
+"""
+Facet counts for the product list sidebar.
+
+One grouped query over the filtered products yields counts per (category, city,
+currency, price bucket) combination, which are folded into the four facets in
+Python; category counts are rolled up to every ancestor. Prices are bucketed per
+currency, since 1000 ETB and 1000 USD don't belong in one bucket. Results are
+cached per normalized filter set and catalog version.
+"""
+import hashlib
+
+from django.db.models import Case, Count, IntegerField, Value, When
+from core.utils.cache import get_or_compute
+from core.utils.conditional import get_version, model_scope
+from .models import Category, City, Product
+
+FACETS_TIMEOUT = 5 * 60
+
+# Lower bounds of the price buckets; the last bucket is open-ended
+PRICE_BUCKETS = (0, 1000, 5000, 10000, 50000, 100000, 500000)
+
+# Query parameters that change presentation rather than which products match
+NON_FILTER_PARAMS = {'page', 'page_size', 'cursor', 'ordering', 'currency', 'facets'}
+
+
+def wants_facets(params):
+    return params.get('facets', '').lower() in ('1', 'true', 'yes')
+
+
+def filter_key(params):
+    """Hash the filtering query parameters, ignoring order, paging and display options."""
+    items = sorted(
+        (name, value.strip())
+        for name in params if name not in NON_FILTER_PARAMS
+        for value in params.getlist(name)
+    )
+    return hashlib.md5(repr(items).encode(), usedforsecurity=False).hexdigest()
+
+
+def _price_bucket():
+    whens = [When(price__lt=upper, then=Value(index)) for index, upper in enumerate(PRICE_BUCKETS[1:])]
+    return Case(*whens, default=Value(len(PRICE_BUCKETS) - 1), output_field=IntegerField())
+
+
+def _versioned(name, model, compute):
+    return get_or_compute(f"{name}:{get_version(model_scope(model))}", compute, timeout=60 * 60)
+
+
+def category_tree():
+    """Return {category id: (name, parent id)}, cached until a category changes."""
+    return _versioned(
+        "category_tree", Category,
+        lambda: {pk: (name, parent) for pk, name, parent in Category.objects.values_list('pk', 'name', 'parent_id')},
+    )
+
+
+def city_names():
+    return _versioned("city_names", City, lambda: dict(City.objects.values_list('pk', 'name')))
+
+
+def _by_count(entry):
+    return -entry['count'], str(entry.get('name', entry.get('value')))
+
+
+def compute_facets(queryset):
+    rows = (
+        queryset.order_by()
+        .annotate(price_bucket=_price_bucket())
+        .values('category_id', 'city_id', 'currency', 'price_bucket')
+        .annotate(total=Count('pk'))
+    )
+    categories, cities, currencies, prices = {}, {}, {}, {}
+    for row in rows:
+        total = row['total']
+        if row['category_id'] is not None:
+            categories[row['category_id']] = categories.get(row['category_id'], 0) + total
+        if row['city_id'] is not None:
+            cities[row['city_id']] = cities.get(row['city_id'], 0) + total
+        currencies[row['currency']] = currencies.get(row['currency'], 0) + total
+        buckets = prices.setdefault(row['currency'], [0] * len(PRICE_BUCKETS))
+        buckets[row['price_bucket']] += total
+
+    tree = category_tree()
+    rolled_up = {}
+    for pk, total in categories.items():
+        seen = set()
+        while pk is not None and pk in tree and pk not in seen:
+            seen.add(pk)
+            rolled_up[pk] = rolled_up.get(pk, 0) + total
+            pk = tree[pk][1]
+
+    names = city_names()
+    return {
+        'category': sorted(
+            ({'id': pk, 'name': tree[pk][0], 'parent': tree[pk][1], 'count': total} for pk, total in rolled_up.items()),
+            key=_by_count,
+        ),
+        'city': sorted(
+            ({'id': pk, 'name': names[pk], 'count': total} for pk, total in cities.items() if pk in names),
+            key=_by_count,
+        ),
+        'currency': sorted(({'value': code, 'count': total} for code, total in currencies.items()), key=_by_count),
+        'price': [
+            {
+                'currency': code, 'min': lower, 'count': total,
+                'max': PRICE_BUCKETS[index + 1] if index + 1 < len(PRICE_BUCKETS) else None,
+            }
+            for code, buckets in sorted(prices.items())
+            for index, (lower, total) in enumerate(zip(PRICE_BUCKETS, buckets))
+        ],
+    }
+
+
+def product_facets(params, queryset):
+    """Return cached facet counts for ``queryset``, which must be filtered by exactly ``params``."""
+    versions = "|".join(repr(get_version(model_scope(model))) for model in (Product, Category, City))
+    key = f"facets:{filter_key(params)}:{hashlib.md5(versions.encode(), usedforsecurity=False).hexdigest()}"
+    return get_or_compute(key, lambda: compute_facets(queryset), timeout=FACETS_TIMEOUT)
@@ -0,0 +1,57 @@
+"""
+City lookups for location-scoped feeds, without PostGIS.
+
+Both helpers narrow products to a set of city ids: ``cities_near`` as a lazy
+subquery (a latitude/longitude range scan on the city index, then an exact
+haversine check), ``region_city_ids`` from a cached region map.
+"""
+import math
+
+from django.db.models import F
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+from core.utils.cache import get_or_compute
+from core.utils.conditional import get_version, model_scope
+from .models import City
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.045
+MAX_RADIUS_KM = 500
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """Return (min_lat, max_lat, min_lon, max_lon) enclosing a circle of ``radius_km``."""
+    lat_delta = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(latitude))
+    lon_delta = 180.0 if cos_lat < 1e-6 else min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+    return latitude - lat_delta, latitude + lat_delta, longitude - lon_delta, longitude + lon_delta
+
+
+def cities_near(latitude, longitude, radius_km):
+    """City queryset within ``radius_km`` of a point, nearest first when evaluated on its own."""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    half_chord = (
+        Power(Sin(Radians(F('latitude') - latitude) / 2), 2)
+        + math.cos(math.radians(latitude)) * Cos(Radians(F('latitude')))
+        * Power(Sin(Radians(F('longitude') - longitude) / 2), 2)
+    )
+    return (
+        City.objects
+        .filter(latitude__range=(min_lat, max_lat), longitude__range=(min_lon, max_lon))
+        .annotate(distance_km=2 * EARTH_RADIUS_KM * ASin(Sqrt(half_chord)))
+        .filter(distance_km__lte=radius_km)
+        .order_by('distance_km')
+    )
+
+
+def _region_map():
+    regions = {}
+    for pk, region in City.objects.order_by('pk').values_list('pk', 'region'):
+        regions.setdefault(region.strip().lower(), []).append(pk)
+    return regions
+
+
+def region_city_ids(region):
+    """Return the ids of cities in ``region`` (case-insensitive) from a cached map."""
+    # Keyed by the City version, so any city write switches to a freshly built map
+    key = f"city_regions:{get_version(model_scope(City))}"
+    return get_or_compute(key, _region_map, timeout=60 * 60).get(region.strip().lower(), [])
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:51
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_favorites_count(apps, schema_editor):
+    Favorite = apps.get_model('product', 'Favorite')
+    Product = apps.get_model('product', 'Product')
+    count = (
+        Favorite.objects.filter(product=OuterRef('pk'))
+        .order_by().values('product').annotate(total=Count('pk')).values('total')
+    )
+    Product.objects.update(favorites_count=Coalesce(Subquery(count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0003_favorite_user_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='inquiry_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_favorites_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-favorites_count', '-created_at'], name='product_favorites_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-view_count', '-created_at'], name='product_views_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-inquiry_count', '-created_at'], name='product_inquiries_idx'),
+        ),
+    ]
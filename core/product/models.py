@@ -1,24 +1,29 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from decimal import Decimal
 import logging
+from core.utils.conditional import bump_version, model_scope
 from core.utils.currency import fetch_live_exchange_rate
 
-# Initialize the logger at the module level (outside the class)
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)  # Set logging level
-console_handler = logging.StreamHandler()  # Logs to console
-console_handler.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+logger = logging.getLogger(__name__)  # Handlers and level come from LOGGING in settings
 
 User = get_user_model()
 
 class City(models.Model):
     name = models.CharField(max_length=100, unique=True)
     region = models.CharField(max_length=100)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['region'], name='city_region_idx'),
+            # Bounding-box prefilter for radius searches (see core.product.geo)
+            models.Index(fields=['latitude', 'longitude'], name='city_lat_lon_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -39,6 +44,30 @@ class Category(models.Model):
     class Meta:
         ordering = ["name"]  
 
+class ProductQuerySet(models.QuerySet):
+    def with_favorites(self, user):
+        """Annotate whether ``user`` has favorited each product, as one EXISTS subquery."""
+        if user is None or not user.is_authenticated:
+            return self.annotate(is_favorited=models.Value(False))
+        favorites = Favorite.objects.filter(product=models.OuterRef('pk'), user=user)
+        return self.annotate(is_favorited=models.Exists(favorites))
+
+    def increment(self, pk, **amounts):
+        """Atomically add to counter fields, e.g. ``increment(pk, view_count=1)``."""
+        updated = self.filter(pk=pk).update(**{field: F(field) + amount for field, amount in amounts.items()})
+        # update() sends no signals, but the counters are part of the product's detail representation
+        bump_version(model_scope(Product, pk))
+        return updated
+
+    def recount_favorites(self):
+        """Reset favorites_count from the Favorite table, for writes whose effect isn't known."""
+        count = (
+            Favorite.objects.filter(product=models.OuterRef('pk'))
+            .order_by().values('product').annotate(total=models.Count('pk')).values('total')
+        )
+        return self.update(favorites_count=Coalesce(models.Subquery(count), 0))
+
+
 class Product(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
@@ -70,17 +99,43 @@ class Product(models.Model):
     )
     image = models.ImageField(upload_to="product_images/", null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Popularity counters, maintained with F() updates rather than aggregated per request
+    favorites_count = models.PositiveIntegerField(default=0, editable=False)
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+    inquiry_count = models.PositiveIntegerField(default=0, editable=False)
 
-    def convert_price(self, target_currency):
+    objects = ProductQuerySet.as_manager()
+
+    COUNTER_FIELDS = ('favorites_count', 'view_count', 'inquiry_count')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-favorites_count', '-created_at'], name='product_favorites_idx'),
+            models.Index(fields=['-view_count', '-created_at'], name='product_views_idx'),
+            models.Index(fields=['-inquiry_count', '-created_at'], name='product_inquiries_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # A full save would write back counter values loaded before concurrent increments
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    def convert_price(self, target_currency, exchange_rate=None):
         """Convert price dynamically based on real-time exchange rates."""
         if self.currency == target_currency or not self.price:
             return self.price
 
-        exchange_rate = fetch_live_exchange_rate(target_currency)
-        logger.info(f"Original price: {self.price}, Exchange rate: {exchange_rate}")
+        if exchange_rate is None:
+            exchange_rate = fetch_live_exchange_rate(target_currency)
+        # Runs once per serialized row: keep it at debug and let logging skip formatting
+        logger.debug("Original price: %s, Exchange rate: %s", self.price, exchange_rate)
 
         if exchange_rate == Decimal("1.0"):
-            logger.warning(f"Exchange rate conversion skipped for product {self.id} as rate is 1.0")
+            logger.warning("Exchange rate conversion skipped for product %s as rate is 1.0", self.id)
             return self.price  # Fallback to original price
 
         return round(self.price * exchange_rate, 2)
@@ -96,6 +151,7 @@ class Favorite(models.Model):
     
     class Meta:
         unique_together = ('user', 'product')  # Prevent duplicate favorites
+        indexes = [models.Index(fields=['user', '-created_at'], name='favorite_user_created_idx')]
 
     def __str__(self):
         return f"{self.user.email} favorited {self.product.title}"
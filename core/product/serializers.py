@@ -2,11 +2,30 @@ from rest_framework import serializers
 from .models import Product, Favorite, Category, City
 from decimal import Decimal, ROUND_DOWN
 from django.conf import settings
+from django.db import IntegrityError, transaction
 import logging
 logger = logging.getLogger(__name__)
 
 
+class ProductCardSerializer(serializers.ModelSerializer):
+    """Compact product summary for embedding; expects category and city to be select_related."""
+    category = serializers.CharField(source='category.name', read_only=True, default=None)
+    city = serializers.CharField(source='city.name', read_only=True, default=None)
+    image_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Product
+        fields = ['id', 'title', 'price', 'currency', 'status', 'category', 'city', 'image_url']
+
+    def get_image_url(self, obj):
+        request = self.context.get('request')
+        if obj.image and request is not None:
+            return request.build_absolute_uri(obj.image.url)
+        return None
+
+
 class FavoriteSerializer(serializers.ModelSerializer):
+    product = ProductCardSerializer(read_only=True)
     product_id = serializers.IntegerField(write_only=True, required=True)  # Ensure it's required and defined properly
 
     class Meta:
@@ -30,11 +49,19 @@ class FavoriteSerializer(serializers.ModelSerializer):
             logger.error(f"Product {product_id} does not exist.")
             raise serializers.ValidationError("Product does not exist.")
 
-        # Prevent duplicate favorites
-        if Favorite.objects.filter(user=user, product=product).exists():
+        # The (user, product) unique constraint rejects duplicates, including concurrent ones
+        try:
+            with transaction.atomic():
+                favorite = Favorite.objects.create(user=user, product=product)
+        except IntegrityError:
             raise serializers.ValidationError("You have already favorited this product.")
-        
-        return Favorite.objects.create(user=user, product=product)
+        Product.objects.increment(product.pk, favorites_count=1)
+        return favorite
+
+
+class FavoriteToggleSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField(min_value=1)
+    favorited = serializers.BooleanField(required=False, allow_null=True, default=None)
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -65,7 +92,10 @@ class CategorySerializer(serializers.ModelSerializer):
 
     def get_subcategories(self, obj):
         """Fetch all subcategories under this category"""
-        return CategorySerializer(obj.subcategories.all(), many=True).data
+        # Callers that preloaded the tree pass {parent_id: [children]} to avoid a query per node
+        children = self.context.get("category_children")
+        subcategories = children.get(obj.id, []) if children is not None else obj.subcategories.all()
+        return CategorySerializer(subcategories, many=True, context=self.context).data
 
     def validate_icon(self, value):
         """Validate icon file format"""
@@ -88,7 +118,7 @@ class CategorySerializer(serializers.ModelSerializer):
 class CitySerializer(serializers.ModelSerializer):
     class Meta:
         model = City
-        fields = ['id','name', 'region']
+        fields = ['id','name', 'region', 'latitude', 'longitude']
 
     
 class ProductSerializer(serializers.ModelSerializer):
@@ -108,12 +138,15 @@ class ProductSerializer(serializers.ModelSerializer):
     formatted_price = serializers.SerializerMethodField()  # Format price as "999.99 ETB"
     currency = serializers.CharField(write_only=True)  # Allow currency to be set during creation
     converted_price = serializers.SerializerMethodField()  # Convert price dynamically
+    # Filled by ProductQuerySet.with_favorites(); the default covers unannotated instances
+    is_favorited = serializers.BooleanField(read_only=True, default=False)
 
     class Meta:
         model = Product
         fields = [
             'id', 'title', 'description', 'price', 'formatted_price', 'converted_price', 'currency',
-            'category', 'category_id','city', 'city_id','seller_name', 'image', 'image_url', 'created_at'
+            'category', 'category_id','city', 'city_id','seller_name', 'image', 'image_url', 'created_at',
+            'is_favorited', 'favorites_count', 'view_count', 'inquiry_count'
         ]  
         
         read_only_fields = ['seller_name', 'created_at', 'formatted_price', 'converted_price']
@@ -158,7 +191,9 @@ class ProductSerializer(serializers.ModelSerializer):
         target_currency = request.query_params.get('currency', obj.currency)
 
         original_price = Decimal(obj.price)
-        converted_price = obj.convert_price(target_currency)
+        # Async views resolve rates up front so serializing never blocks on the rates API
+        exchange_rate = self.context.get('exchange_rates', {}).get(target_currency)
+        converted_price = obj.convert_price(target_currency, exchange_rate)
         exchange_rate = Decimal(converted_price / original_price) if original_price else Decimal("1.0")
 
         return {
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.utils.conditional import bump_model_version
+from .models import Category, City, Product
+
+
+@receiver([post_save, post_delete], sender=City)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Product)
+def bump_catalog_version(sender, instance, **kwargs):
+    """Invalidate conditional GET validators whenever catalog rows change."""
+    bump_model_version(sender, instance.pk)
@@ -1,3 +1,283 @@
-from django.test import TestCase
+import csv
+import io
+import json
 
-# Create your tests here.
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.viewsets import ReadOnlyModelViewSet
+from rest_framework.test import APIClient
+from core.user.authentication import UserClaimsRefreshToken
+from core.user.models import User
+from core.utils.cache import cache, get_or_compute
+from core.utils.conditional import get_version, model_scope
+from core.utils.db import _read_alias, read_alias
+from core.utils.response_cache import CachedResponseMixin
+from .models import Category, City, Favorite, Product
+from .tracking import ViewBuffer
+from .views import FavoriteViewSet
+
+
+class ProductTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create_user(email="seller@example.com", password="pass12345")
+        self.buyer = User.objects.create_user(email="buyer@example.com", password="pass12345")
+        self.category = Category.objects.create(name="Phones")
+        self.product = self.make_product("Phone")
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def make_product(self, title, **fields):
+        fields = {'owner': self.seller, 'seller': self.seller, **fields}
+        return Product.objects.create(title=title, description="Used", price="100.00", category=self.category, **fields)
+
+
+class ReplicaCachingTests(ProductTestCase):
+    def setUp(self):
+        super().setUp()
+        # Route reads as a replica-routed request would; "default" keeps the queries working
+        token = _read_alias.set('default')
+        self.addCleanup(_read_alias.reset, token)
+
+    def test_cache_fills_read_the_primary(self):
+        self.assertIsNone(get_or_compute("replica-test", read_alias, timeout=60))
+        self.assertEqual(read_alias(), 'default')
+
+    def test_replica_responses_carry_no_validators(self):
+        response = self.client.get(f'/api/product/{self.product.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+
+class FavoriteTests(ProductTestCase):
+    def detail(self):
+        return self.client.get(f'/api/product/{self.product.pk}/')
+
+    def favorites_count(self):
+        self.product.refresh_from_db()
+        return self.product.favorites_count
+
+    def toggle(self, **data):
+        return self.client.post('/api/product/favorites/toggle/', {'product_id': self.product.pk, **data}, format='json')
+
+    def test_toggle_flips_and_counts(self):
+        self.assertEqual(self.toggle().data['is_favorited'], True)
+        self.assertEqual(self.favorites_count(), 1)
+        self.assertEqual(self.toggle().data['is_favorited'], False)
+        self.assertEqual(self.favorites_count(), 0)
+
+    def test_explicit_toggle_is_idempotent(self):
+        self.toggle(favorited=True)
+        self.toggle(favorited=True)
+        self.assertEqual(self.favorites_count(), 1)
+        self.toggle(favorited=False)
+        self.toggle(favorited=False)
+        self.assertEqual(self.favorites_count(), 0)
+
+    def assert_changes_etag(self, write):
+        etag = self.detail()['ETag']
+        self.assertEqual(self.client.get(f'/api/product/{self.product.pk}/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        write()
+        response = self.client.get(f'/api/product/{self.product.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_duplicate_adds_are_400_and_count_once(self):
+        for url in ('/api/product/favorites/add/', '/api/product/favorites/'):
+            with self.subTest(url=url):
+                Favorite.objects.create(user=self.buyer, product=self.product)  # Inserted by a racing request
+                response = self.client.post(url, {'product_id': self.product.pk}, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(self.favorites_count(), 0)
+                Favorite.objects.all().delete()
+
+    def test_racing_deletes_decrement_once(self):
+        self.toggle(favorited=True)
+        stale = Favorite.objects.get()
+        Favorite.objects.filter(pk=stale.pk).delete()  # The other request's delete
+        Product.objects.filter(pk=self.product.pk).update(favorites_count=0)
+        FavoriteViewSet().perform_destroy(stale)
+        self.assertEqual(self.favorites_count(), 0)
+
+    def test_removing_twice_decrements_once(self):
+        self.toggle(favorited=True)
+        self.assertEqual(self.client.delete(f'/api/product/favorites/{self.product.pk}/remove/').status_code, 204)
+        self.assertEqual(self.client.delete(f'/api/product/favorites/{self.product.pk}/remove/').status_code, 400)
+        self.assertEqual(self.favorites_count(), 0)
+
+    def test_list_is_scoped_to_the_user_and_cursor_paginated(self):
+        products = [self.product] + [self.make_product(f"Phone {n}") for n in range(4)]
+        for product in products:
+            Favorite.objects.create(user=self.buyer, product=product)
+        Favorite.objects.create(user=self.seller, product=self.product)
+
+        seen, url = [], '/api/product/favorites/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen += [row['product']['id'] for row in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, [product.pk for product in reversed(products)])
+
+    def test_list_query_count_does_not_grow_with_the_page(self):
+        def queries(page_size):
+            with CaptureQueriesContext(connection) as captured:
+                self.client.get(f'/api/product/favorites/?page_size={page_size}')
+            return len(captured)
+
+        for n in range(4):
+            Favorite.objects.create(user=self.buyer, product=self.make_product(f"Phone {n}"))
+        self.assertEqual(queries(1), queries(4))
+
+    def test_every_favorite_write_changes_the_etag(self):
+        add = lambda: self.client.post('/api/product/favorites/add/', {'product_id': self.product.pk}, format='json')
+        remove = lambda: self.client.delete(f'/api/product/favorites/{self.product.pk}/remove/')
+        create = lambda: self.client.post('/api/product/favorites/', {'product_id': self.product.pk}, format='json')
+
+        self.assertEqual(self.assert_changes_etag(add).data['favorites_count'], 1)
+        self.assertEqual(self.assert_changes_etag(remove).data['favorites_count'], 0)
+        self.assertEqual(self.assert_changes_etag(create).data['favorites_count'], 1)
+        favorite = self.buyer.favorites.get()
+        destroy = lambda: self.client.delete(f'/api/product/favorites/{favorite.pk}/')
+        response = self.assert_changes_etag(destroy)
+        self.assertEqual(response.data['favorites_count'], 0)
+        self.assertFalse(response.data['is_favorited'])
+
+
+class ViewCountTests(ProductTestCase):
+    def test_flush_writes_views_and_bumps_versions(self):
+        other = self.make_product("Tablet")
+        version = get_version(model_scope(Product, self.product.pk))
+        untouched = get_version(model_scope(Product, other.pk))
+        views = ViewBuffer()
+        views._counts[self.product.pk] += 3
+
+        self.assertEqual(views.flush(), 3)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.view_count, 3)
+        self.assertNotEqual(get_version(model_scope(Product, self.product.pk)), version)
+        self.assertEqual(get_version(model_scope(Product, other.pk)), untouched)
+        self.assertEqual(views.flush(), 0)
+
+    def test_versions_are_bumped_once_per_interval(self):
+        views = ViewBuffer()
+        views._counts[self.product.pk] += 1
+        views.flush()
+        version = get_version(model_scope(Product, self.product.pk))
+
+        views._counts[self.product.pk] += 1
+        views.flush()
+        self.assertEqual(get_version(model_scope(Product, self.product.pk)), version)
+        with override_settings(VIEW_VERSION_INTERVAL=0):
+            views._counts[self.product.pk] += 1
+            views.flush()
+        self.assertNotEqual(get_version(model_scope(Product, self.product.pk)), version)
+
+    def test_revalidated_detail_keeps_its_etag(self):
+        views = ViewBuffer()
+        views._counts[self.product.pk] += 1
+        views.flush()  # First flush for the product bumps it
+        etag = self.client.get(f'/api/product/{self.product.pk}/')['ETag']
+        views._counts[self.product.pk] += 1
+        views.flush()
+        response = self.client.get(f'/api/product/{self.product.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class AsyncProductListTests(ProductTestCase):
+    def setUp(self):
+        super().setUp()
+        token = UserClaimsRefreshToken.for_user(self.buyer).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_lists_products(self):
+        response = self.client.get('/api/product/async/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.product.pk])
+
+    def test_invalid_filters_are_400(self):
+        for query in ('near=abc', 'near=10,20&radius=-1', 'min_price=cheap'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/product/async/?{query}')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response['Content-Type'], 'application/json')
+
+
+class FacetTests(ProductTestCase):
+    def test_prices_are_bucketed_per_currency(self):
+        self.make_product("Laptop", currency='USD')
+        response = self.client.get('/api/product/?facets=1')
+        self.assertEqual(response.status_code, 200)
+        buckets = {
+            (entry['currency'], entry['min']): entry['count']
+            for entry in response.json()['facets']['price'] if entry['count']
+        }
+        self.assertEqual(buckets, {('ETB', 0): 1, ('USD', 0): 1})
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.city = City.objects.create(name="Addis Ababa", region="Addis Ababa")
+        self.client = APIClient()
+
+    def test_anonymous_list_is_public_and_cached(self):
+        first = self.client.get('/api/product/cities/')
+        self.assertIn('public', first['Cache-Control'])
+        City.objects.filter(pk=self.city.pk).update(name="Renamed")  # No signal, so no new version
+        self.assertEqual(self.client.get('/api/product/cities/').content, first.content)
+
+    def test_errors_are_neither_public_nor_cached(self):
+        response = self.client.get('/api/product/cities/999999/')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('public', response.get('Cache-Control', ''))
+
+    def test_requires_conditional_get_mixin_first(self):
+        with self.assertRaises(ImproperlyConfigured):
+            type('BrokenViewSet', (CachedResponseMixin, ReadOnlyModelViewSet), {})
+
+
+class ExportTests(ProductTestCase):
+    def rows(self, response):
+        content = b''.join(response.streaming_content).decode()
+        return list(csv.DictReader(io.StringIO(content)))
+
+    def test_catalog_export_is_admin_only(self):
+        self.assertEqual(self.client.get('/api/product/export/csv/').status_code, 403)
+        self.client.force_authenticate(User.objects.create_superuser(email="admin@example.com", password="pass12345"))
+        response = self.client.get('/api/product/export/csv/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="products.csv"', response['Content-Disposition'])
+        self.assertEqual([row['id'] for row in self.rows(response)], [str(self.product.pk)])
+
+    def test_exports_require_authentication(self):
+        self.client.force_authenticate(None)
+        for url in ('/api/product/favorites/export/csv/', '/api/product/my-listings/export/csv/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_listings_export_only_the_vendors_own(self):
+        vendor = User.objects.create_user(email="vendor@example.com", password="pass12345", role="vendor")
+        mine = self.make_product("Bike", owner=vendor, seller=vendor)
+        self.client.force_authenticate(vendor)
+        response = self.client.get('/api/product/my-listings/export/csv/')
+        self.assertEqual([row['id'] for row in self.rows(response)], [str(mine.pk)])
+
+    def test_csv_escapes_formulas(self):
+        for title in ('=HYPERLINK("http://evil")', '+1', '-1', '@SUM(A1)', '\tTab'):
+            Favorite.objects.create(user=self.buyer, product=self.make_product(title))
+        response = self.client.get('/api/product/favorites/export/csv/')
+        titles = {row['title'] for row in self.rows(response)}
+        self.assertEqual(titles, {"'=HYPERLINK(\"http://evil\")", "'+1", "'-1", "'@SUM(A1)", "'\tTab"})
+
+    def test_ndjson_export(self):
+        Favorite.objects.create(user=self.buyer, product=self.product)
+        response = self.client.get('/api/product/favorites/export/ndjson/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['product_id'], self.product.pk)
+        self.assertEqual(records[0]['price'], '100.00')
@@ -0,0 +1,113 @@
+"""
+Write-behind product view counting.
+
+record_view() only bumps an in-memory counter, so a detail request never waits on
+a write. A daemon thread per process folds the buffer into Product.view_count
+every VIEW_FLUSH_INTERVAL seconds with one UPDATE ... CASE per chunk; the buffer is
+also flushed at interpreter exit. Each gunicorn worker keeps its own buffer and
+the increments are additive, so workers never overwrite each other, and a crashed
+worker loses at most one interval of views. A flush bumps the version of a product
+it wrote only if it hasn't done so for VIEW_VERSION_INTERVAL, so viewed products
+keep answering revalidations with 304 while view_count catches up periodically.
+"""
+import atexit
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import Case, F, Value, When
+from core.utils.conditional import bump_version, model_scope
+from core.utils.metrics import registry
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+FLUSH_CHUNK_SIZE = 500
+
+VIEWS_FLUSHED = registry.counter('product_views_flushed_total', 'Product views written to the database.')
+
+
+class ViewBuffer:
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._stopped = threading.Event()
+        self._bumped = {}  # {product id: when its version was last bumped}, used by the flush thread only
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # The parent flushes its own views; a worker starts empty, with its own thread
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def record(self, product_id):
+        with self._lock:
+            self._counts[product_id] += 1
+            if self._pid != os.getpid():
+                self._start()
+
+    def _start(self):
+        self._pid = os.getpid()
+        self._stopped = threading.Event()
+        threading.Thread(target=self._run, args=(self._stopped,), name='view-buffer', daemon=True).start()
+
+    def _run(self, stopped):
+        while not stopped.wait(settings.VIEW_FLUSH_INTERVAL):
+            self.flush()
+            connections.close_all()
+
+    def flush(self):
+        """Write buffered views to the database; returns the number of views written."""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        if not counts:
+            return 0
+
+        items = list(counts.items())
+        written = 0
+        for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+            chunk = dict(items[start:start + FLUSH_CHUNK_SIZE])
+            increment = Case(*(When(pk=pk, then=Value(n)) for pk, n in chunk.items()), default=Value(0))
+            try:
+                Product.objects.filter(pk__in=chunk).update(view_count=F('view_count') + increment)
+            except DatabaseError:
+                logger.exception("Failed to flush %s product views; keeping them for the next flush", sum(chunk.values()))
+                with self._lock:
+                    self._counts.update(dict(items[start:]))
+                break
+            self._bump_versions(chunk)
+            written += sum(chunk.values())
+        VIEWS_FLUSHED.inc(written)
+        return written
+
+    def _bump_versions(self, product_ids):
+        now = time.monotonic()
+        due = [pk for pk in product_ids if now - self._bumped.get(pk, -math.inf) >= settings.VIEW_VERSION_INTERVAL]
+        if due:
+            bump_version(*(model_scope(Product, pk) for pk in due))
+            self._bumped.update(dict.fromkeys(due, now))
+        if len(self._bumped) > 2 * FLUSH_CHUNK_SIZE:
+            # Entries past the interval would bump anyway; dropping them bounds the dict
+            self._bumped = {
+                pk: at for pk, at in self._bumped.items() if now - at < settings.VIEW_VERSION_INTERVAL
+            }
+
+    def stop(self):
+        self._stopped.set()
+        self.flush()
+
+
+buffer = ViewBuffer()
+atexit.register(buffer.stop)
+
+
+def record_view(product_id):
+    """Count one view of a product; cheap enough to call on every detail request."""
+    buffer.record(int(product_id))
@@ -1,14 +1,21 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import ProductViewSet, CategoryViewSet, FavoriteViewSet, MyListingsViewSet, CityViewSet
 
 router = DefaultRouter()
-router.register(r'', ProductViewSet, basename='product')  # Ensure correct name is given
 router.register(r'categories', CategoryViewSet, basename='categories')
 router.register(r'cities', CityViewSet, basename='city')
 router.register(r'favorites', FavoriteViewSet, basename='favorite')
 router.register(r'my-listings', MyListingsViewSet, basename='my-listings')
+# Registered last so its "<pk>/" detail route doesn't shadow the prefixes above
+router.register(r'', ProductViewSet, basename='product')  # Ensure correct name is given
 
 urlpatterns = [
+    # ASGI-native read paths; listed first so the router's "<pk>/" route doesn't catch them
+    path('async/', async_views.product_list, name='product-async-list'),
+    path('async/<int:pk>/', async_views.product_detail, name='product-async-detail'),
+    path('async/categories/', async_views.category_list, name='categories-async-list'),
+    path('async/cities/', async_views.city_list, name='city-async-list'),
     path('', include(router.urls)),
 ]
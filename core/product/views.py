@@ -1,10 +1,10 @@
 from .models import Product, Category, City, Favorite
-from .serializers import ProductSerializer, CategorySerializer, FavoriteSerializer, CitySerializer
+from .serializers import ProductSerializer, CategorySerializer, FavoriteSerializer, FavoriteToggleSerializer, CitySerializer
 from rest_framework.filters import OrderingFilter, SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.viewsets import ReadOnlyModelViewSet, ModelViewSet
-from django.core.cache import cache
+from core.utils.cache import cache, get_or_compute
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
@@ -15,11 +15,48 @@ import logging
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework import serializers
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
-from rest_framework.exceptions import ValidationError, PermissionDenied
+from rest_framework.exceptions import ValidationError, PermissionDenied, NotFound
+from django.db import IntegrityError, transaction
 from django.views.decorators.csrf import csrf_exempt
+from core.utils.conditional import ConditionalGetMixin, bump_version, model_scope
+from core.utils.export import ExportNegotiation, export_response
+from core.utils.replicas import ReadReplicaMixin
+from core.utils.response_cache import CachedResponseMixin
+from .facets import product_facets, wants_facets
+from .geo import MAX_RADIUS_KM, cities_near, region_city_ids
+from .tracking import record_view
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_RADIUS_KM = 25
+
+EXPORT_URL_PATH = r'export/(?P<export_format>csv|ndjson)'
+
+# Export column -> values_list lookup
+PRODUCT_EXPORT_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'description': 'description',
+    'price': 'price',
+    'currency': 'currency',
+    'status': 'status',
+    'category': 'category__name',
+    'city': 'city__name',
+    'seller_id': 'seller_id',
+    'created_at': 'created_at',
+    'favorites_count': 'favorites_count',
+    'view_count': 'view_count',
+    'inquiry_count': 'inquiry_count',
+}
+FAVORITE_EXPORT_FIELDS = {
+    'product_id': 'product_id',
+    'title': 'product__title',
+    'price': 'product__price',
+    'currency': 'product__currency',
+    'status': 'product__status',
+    'favorited_at': 'created_at',
+}
+
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     """Custom permission to allow only admin users to create/edit cities."""
@@ -28,15 +65,41 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return request.method in permissions.SAFE_METHODS or request.user.is_staff
 
 
-class CityViewSet(ReadOnlyModelViewSet):
+def near_cities(value, radius=None):
+    """Parse ``near=<lat>,<lon>`` and ``radius`` (km) into a queryset of nearby cities."""
+    try:
+        latitude, longitude = (float(part) for part in value.split(','))
+        radius = float(radius) if radius else DEFAULT_RADIUS_KM
+    except ValueError:
+        raise ValidationError({"near": "Use near=<latitude>,<longitude> with an optional radius in km."})
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValidationError({"near": "Latitude or longitude out of range."})
+    if not 0 < radius <= MAX_RADIUS_KM:
+        raise ValidationError({"radius": f"Radius must be between 0 and {MAX_RADIUS_KM} km."})
+    return cities_near(latitude, longitude, radius)
+
+
+class CityFilter(django_filters.FilterSet):
+    near = django_filters.CharFilter(method="filter_near")
+
+    class Meta:
+        model = City
+        fields = ['name', 'region', 'near']
+
+    def filter_near(self, queryset, name, value):
+        return queryset.filter(pk__in=near_cities(value, self.data.get('radius')).values('pk'))
+
+
+class CityViewSet(ReadReplicaMixin, ConditionalGetMixin, CachedResponseMixin, ReadOnlyModelViewSet):
     queryset = City.objects.all()
     serializer_class = CitySerializer
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['name', 'region']
+    filterset_class = CityFilter
+    conditional_models = (City,)
 
 
-class CategoryViewSet(ModelViewSet):
+class CategoryViewSet(ReadReplicaMixin, ConditionalGetMixin, CachedResponseMixin, ModelViewSet):
     
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -45,6 +108,7 @@ class CategoryViewSet(ModelViewSet):
     search_fields = ['name']
     ordering_fields = ['name']
     parser_classes = [MultiPartParser, FormParser]
+    conditional_models = (Category,)
 
     def get_permissions(self):
         if self.request.method in ['GET']:
@@ -71,6 +135,8 @@ class CategoryViewSet(ModelViewSet):
             return Response({"detail": "No matching categories found."}, status=status.HTTP_404_NOT_FOUND)
         categories.update(name=name)
         cache.delete("categories")
+        # Queryset updates bypass model signals, so invalidate validators here
+        bump_version(model_scope(Category), *(model_scope(Category, pk) for pk in ids))
         return Response({"detail": "Categories updated successfully."}, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['delete'], permission_classes=[permissions.IsAdminUser])
@@ -83,11 +149,34 @@ class CategoryViewSet(ModelViewSet):
         return Response({"detail": f"{deleted_count} categories deleted successfully."}, status=status.HTTP_200_OK)
 
 
-class FavoriteViewSet(viewsets.ModelViewSet):
-    queryset = Favorite.objects.all()
+class FavoritePagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-created_at'
+
+
+class FavoriteViewSet(ReadReplicaMixin, viewsets.ModelViewSet):
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FavoritePagination
     http_method_names = ['get', 'post', 'delete', 'head', 'options']
+    throttle_scopes = {'create': 'favorites', 'add_favorite': 'favorites', 'toggle': 'favorites', 'export': 'export'}
+
+    def get_queryset(self):
+        return Favorite.objects.filter(user=self.request.user).select_related('product__category', 'product__city')
+
+    def perform_destroy(self, instance):
+        # A concurrent delete may have won; only the request that removed the row decrements
+        removed, _ = Favorite.objects.filter(pk=instance.pk).delete()
+        if removed:
+            Product.objects.increment(instance.product_id, favorites_count=-removed)
+
+    @action(detail=False, methods=['get'], url_path=EXPORT_URL_PATH, content_negotiation_class=ExportNegotiation)
+    def export(self, request, export_format):
+        """Stream all of the user's favorites, newest first, as CSV or NDJSON."""
+        queryset = Favorite.objects.filter(user=request.user).order_by('-created_at')
+        return export_response(queryset, FAVORITE_EXPORT_FIELDS, export_format, 'favorites')
 
     @action(detail=False, methods=['post'], url_path='add')
     def add_favorite(self, request, *args, **kwargs):
@@ -97,17 +186,59 @@ class FavoriteViewSet(viewsets.ModelViewSet):
         product = Product.objects.filter(id=product_id).first()
         if not product:
             raise ValidationError({"error": "Product does not exist."})
-        if Favorite.objects.filter(user=request.user, product=product).exists():
+        # The (user, product) unique constraint rejects duplicates, including concurrent ones
+        try:
+            with transaction.atomic():
+                favorite = Favorite.objects.create(user=request.user, product=product)
+        except IntegrityError:
             raise ValidationError({"error": "Product already favorited."})
-        favorite = Favorite.objects.create(user=request.user, product=product)
-        return Response(FavoriteSerializer(favorite).data, status=status.HTTP_201_CREATED)
+        Product.objects.increment(product.pk, favorites_count=1)
+        return Response(
+            FavoriteSerializer(favorite, context=self.get_serializer_context()).data, status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=['post'])
+    def toggle(self, request):
+        """
+        Flip a favorite, or set it when ``favorited`` is given (safe to retry).
+
+        Relies on the (user, product) unique constraint: a delete that removes nothing
+        is followed by an insert that ignores conflicts, instead of check-then-insert.
+        """
+        serializer = FavoriteToggleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product_id = serializer.validated_data['product_id']
+        requested = serializer.validated_data.get('favorited')
+
+        removed = 0
+        if requested is not True:
+            removed, _ = Favorite.objects.filter(user=request.user, product_id=product_id).delete()
+        favorited = requested is True or (requested is None and not removed)
+        if favorited:
+            try:
+                with transaction.atomic():
+                    Favorite.objects.bulk_create(
+                        [Favorite(user=request.user, product_id=product_id)], ignore_conflicts=True
+                    )
+            except IntegrityError:
+                raise NotFound("Product does not exist.")
+
+        if removed:
+            Product.objects.increment(product_id, favorites_count=-removed)
+        elif requested is None:
+            Product.objects.increment(product_id, favorites_count=1)
+        elif requested:
+            # An explicit set may have hit an existing row and the ignored conflict doesn't say
+            Product.objects.filter(pk=product_id).recount_favorites()
+            bump_version(model_scope(Product, product_id))  # increment() bumps in the other branches
+        return Response({"product_id": product_id, "is_favorited": favorited}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['DELETE'])
     def remove(self, request, pk=None):
-        favorite = Favorite.objects.filter(user=request.user, product_id=pk).first()
-        if not favorite:
+        removed, _ = Favorite.objects.filter(user=request.user, product_id=pk).delete()
+        if not removed:
             return Response({"error": "Product not in favorites"}, status=status.HTTP_400_BAD_REQUEST)
-        favorite.delete()
+        Product.objects.increment(pk, favorites_count=-removed)
         return Response({"message": "Removed from favorites"}, status=status.HTTP_204_NO_CONTENT)
 
 
@@ -115,10 +246,19 @@ class ProductFilter(django_filters.FilterSet):
     min_price = django_filters.NumberFilter(field_name="price", lookup_expr="gte")
     max_price = django_filters.NumberFilter(field_name="price", lookup_expr="lte")
     category = django_filters.CharFilter(field_name="category__name", lookup_expr="iexact")
+    city = django_filters.NumberFilter(field_name="city_id")
+    region = django_filters.CharFilter(method="filter_region")
+    near = django_filters.CharFilter(method="filter_near")
 
     class Meta:
         model = Product
-        fields = ['category', 'min_price', 'max_price']
+        fields = ['category', 'min_price', 'max_price', 'city', 'region', 'near']
+
+    def filter_region(self, queryset, name, value):
+        return queryset.filter(city_id__in=region_city_ids(value))
+
+    def filter_near(self, queryset, name, value):
+        return queryset.filter(city_id__in=near_cities(value, self.data.get('radius')).values('pk'))
 
 
 class ProductPagination(PageNumberPagination):
@@ -127,25 +267,52 @@ class ProductPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class ProductViewSet(ModelViewSet):
+class ProductViewSet(ReadReplicaMixin, ConditionalGetMixin, ModelViewSet):
     queryset = Product.objects.select_related('category').prefetch_related('images').all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = ProductPagination
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     filterset_class = ProductFilter
-    ordering_fields = ['price', 'created_at']
+    ordering_fields = ['price', 'created_at', 'favorites_count', 'view_count', 'inquiry_count']
     ordering = ['-created_at']
     search_fields = ['title', 'description']
+    conditional_models = (Product, Category, City)
+    conditional_scopes = ('exchange_rates',)  # converted_price depends on live rates
+    conditional_actions = ('retrieve',)
+    conditional_per_user = True  # is_favorited differs between users
+    throttle_scopes = {'export': 'export'}
 
     def get_queryset(self):
-        cached_products = cache.get("products")
-        if cached_products is None:
-            products = list(Product.objects.select_related('category').all().values())
-            cache.set("products", products, timeout=300)
-        else:
-            products = cached_products
-        return Product.objects.filter(id__in=[p['id'] for p in products])
+        product_ids = get_or_compute(
+            "products", lambda: list(Product.objects.values_list('id', flat=True)), timeout=300
+        )
+        return Product.objects.filter(id__in=product_ids).with_favorites(self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK and wants_facets(request.query_params):
+            # Facets cover every match, not just the cached id list behind get_queryset
+            queryset = self.filter_queryset(Product.objects.all())
+            response.data['facets'] = product_facets(request.query_params, queryset)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        # A 304 is a client showing the product again from its cache, so it counts as a view;
+        # flushes bump versions only every VIEW_VERSION_INTERVAL, so this doesn't churn ETags
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            record_view(kwargs['pk'])
+        return response
+
+    @action(
+        detail=False, methods=['get'], url_path=EXPORT_URL_PATH,
+        permission_classes=[IsAdminUser], content_negotiation_class=ExportNegotiation,
+    )
+    def export(self, request, export_format):
+        """Full catalog dump for admins; accepts the list filters."""
+        queryset = self.filter_queryset(Product.objects.all()).order_by('pk')
+        return export_response(queryset, PRODUCT_EXPORT_FIELDS, export_format, 'products')
 
     def perform_create(self, serializer):
         if self.request.user.is_authenticated:
@@ -166,9 +333,10 @@ class ProductViewSet(ModelViewSet):
         cache.delete("products")
 
 
-class MyListingsViewSet(viewsets.ModelViewSet):
+class MyListingsViewSet(ReadReplicaMixin, viewsets.ModelViewSet):
     serializer_class = ProductSerializer
     permission_classes = [IsAdminOrOwner]
+    throttle_scopes = {'export': 'export'}
 
     def get_queryset(self):
         user = self.request.user
@@ -177,3 +345,8 @@ class MyListingsViewSet(viewsets.ModelViewSet):
         if user.role == "vendor":
             return Product.objects.filter(seller=user)
         return Product.objects.none()
+
+    @action(detail=False, methods=['get'], url_path=EXPORT_URL_PATH, content_negotiation_class=ExportNegotiation)
+    def export(self, request, export_format):
+        """Stream all of the user's listings (every listing for admins) as CSV or NDJSON."""
+        return export_response(self.get_queryset().order_by('pk'), PRODUCT_EXPORT_FIELDS, export_format, 'listings')
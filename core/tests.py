@@ -0,0 +1,161 @@
+import asyncio
+import gzip
+import threading
+import time
+from io import StringIO
+from unittest import mock, skipIf
+
+import httpx
+import requests
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from core.benchmarks import load, startup
+from core.middleware import compression
+from core.middleware.compression import CompressionMiddleware
+from core.middleware.profiling import ProfilingMiddleware
+from core.utils import currency
+from core.utils import cache as cache_module
+from core.utils.cache import aget_or_compute, cache
+
+
+HTML_BODY = b'<html>Bad gateway</html>'
+
+
+def html_response():
+    """A 200 whose body isn't JSON, as a proxy's error page would be."""
+    response = requests.Response()
+    response.status_code, response._content, response.encoding = 200, HTML_BODY, 'utf-8'
+    return response
+
+
+class ConversionRatesTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_non_json_body_is_a_cached_failure(self):
+        with mock.patch('requests.get', return_value=html_response()) as get:
+            self.assertIsNone(currency.conversion_rates())
+            self.assertIsNone(currency.conversion_rates())
+        get.assert_called_once()  # Kept for RATES_FAILURE_TIMEOUT instead of retried per request
+        self.assertEqual(currency.fetch_live_exchange_rate('USD'), 1)
+
+    def test_async_non_json_body_is_a_failure(self):
+        get = mock.AsyncMock(return_value=httpx.Response(200, content=HTML_BODY))
+        with mock.patch.object(httpx.AsyncClient, 'get', get):
+            self.assertIsNone(async_to_sync(currency.afetch_conversion_rates)())
+
+
+class AsyncGetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_single_flight_within_a_loop(self):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'value'
+
+        async def main():
+            return await asyncio.gather(*(aget_or_compute('single-flight', compute, timeout=60) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), ['value'] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_concurrent_loops_do_not_share_locks(self):
+        errors = []
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return None  # Not cached, so every loop contends for the key
+
+        def run():
+            async def main():
+                await asyncio.gather(*(aget_or_compute('per-loop', compute, timeout=60, wait=0) for _ in range(3)))
+            try:
+                asyncio.run(main())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertFalse(any(cache_module._async_key_locks.values()))  # Emptied as waiters left
+
+
+class StartupTests(SimpleTestCase):
+    def test_http_clients_are_not_imported_at_startup(self):
+        measured, _ = startup.sample()
+        self.assertEqual(startup.project_eager_imports(measured['importers']), [])
+        self.assertGreater(measured['setup'], 0)
+
+
+class BenchmarkCommandTests(TransactionTestCase):
+    """Run each in-process benchmark once against a tiny dataset, so they keep working."""
+
+    def test_benchmarks_run_on_a_tiny_seed(self):
+        call_command(
+            'seed_bench_data', users=3, categories=3, depth=2, cities=2, products=10, favorites=1,
+            cart_items=1, conversations=2, messages=2, stdout=StringIO(),
+        )
+        for name, options in (
+            ('bench_serializers', {'page_size': 5, 'repeat': 1}),
+            ('bench_api', {'requests': 2, 'warmup': 0}),
+            ('bench_compression', {'page_size': 5, 'repeat': 1}),
+        ):
+            with self.subTest(command=name):
+                out = StringIO()
+                call_command(name, stdout=out, **options)
+                self.assertIn('p50', out.getvalue())
+
+        for endpoint, summary in load.run(requests=2, warmup=0).items():
+            self.assertEqual(summary['errors'], 0, endpoint)
+
+
+@override_settings(PROFILING_SLOW_MS=10, PROFILING_SAMPLE_RATE=0.0)
+class SlowRequestLogTests(SimpleTestCase):
+    def test_unsampled_slow_requests_are_logged(self):
+        def view(request):
+            time.sleep(0.02)
+            return HttpResponse('done')
+
+        with self.assertLogs('core.slow_requests', 'WARNING') as logs:
+            response = ProfilingMiddleware(view)(RequestFactory().get('/slow/'))
+        self.assertNotIn('Server-Timing', response)  # Full profiling stays behind the sample rate
+        self.assertEqual(logs.records[0].path, '/slow/')
+        self.assertGreaterEqual(logs.records[0].total_ms, 10)
+
+
+class CompressionTests(SimpleTestCase):
+    body = b'{"results": [%s]}' % b', '.join(b'{"id": %d, "title": "Phone"}' % i for i in range(200))
+
+    def json_view(self, request):
+        return HttpResponse(self.body, content_type='application/json')
+
+    def test_gzip_lengths_are_randomized(self):
+        outputs = [compression.compress(self.body, 'gzip', 6, max_random_bytes=100) for _ in range(20)]
+        self.assertGreater(len({len(output) for output in outputs}), 1)
+        for output in outputs:
+            self.assertEqual(gzip.decompress(output), self.body)
+
+    def test_streamed_gzip_round_trips(self):
+        process, finish = compression.compressor('gzip', 6, max_random_bytes=100)
+        output = b''.join(process(self.body[i:i + 500]) for i in range(0, len(self.body), 500)) + finish()
+        self.assertEqual(gzip.decompress(output), self.body)
+
+    @skipIf(compression.brotli is None, 'brotli is not installed')
+    def test_credentialed_requests_get_padded_gzip(self):
+        factory = RequestFactory(headers={'Accept-Encoding': 'br, gzip'})
+        anonymous = CompressionMiddleware(self.json_view)(factory.get('/products/'))
+        self.assertEqual(anonymous['Content-Encoding'], 'br')
+
+        request = factory.get('/products/', headers={'Authorization': 'Bearer token'})
+        response = CompressionMiddleware(self.json_view)(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
-from .models import User
+from .models import RevokedToken, User
 
 class UserAdmin(BaseUserAdmin):
     ordering = ['email']
@@ -26,3 +26,9 @@ class UserAdmin(BaseUserAdmin):
     readonly_fields = ('public_id',)
 
 admin.site.register(User, UserAdmin)
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ['jti', 'expires_at']
+    search_fields = ['jti']
@@ -0,0 +1,86 @@
+"""
+JWT authentication that usually resolves the user without a database query.
+
+A user's ``role``, ``is_staff`` and ``is_active`` are cached for
+AUTH_STATE_TIMEOUT seconds. A cache hit builds ``request.user`` from those
+values; a miss (expired, evicted, or never written) loads them from the database
+and refills the cache, so a lost entry can never grant more than the database
+does. Saving a user refreshes the entry and deleting one drops it; writes that
+bypass signals, such as ``QuerySet.update()``, take effect within the timeout.
+
+Tokens also carry these values as claims, for clients, but they are never
+trusted for authorization. ``request.user`` is a ``User`` whose other fields are
+deferred; the first access to any of them loads them all in one query.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.utils.cache import cache
+from core.utils.db import use_primary
+from .models import User
+
+USER_CLAIMS = ('role', 'is_staff', 'is_active')
+
+
+def auth_state_key(user_id):
+    return f"auth_user:{user_id}"
+
+
+def remember_auth_state(user):
+    """Cache a user's current auth fields; called whenever a user is saved."""
+    state = {claim: getattr(user, claim) for claim in USER_CLAIMS}
+    cache.set(auth_state_key(user.pk), state, timeout=settings.AUTH_STATE_TIMEOUT)
+    return state
+
+
+def forget_auth_state(user_id):
+    cache.delete(auth_state_key(user_id))
+
+
+def load_auth_state(user_id):
+    """Return the cached auth fields for a user, reading them from the database on a miss."""
+    state = cache.get(auth_state_key(user_id))
+    if state is None:
+        with use_primary():
+            state = User.objects.filter(pk=user_id).values(*USER_CLAIMS).first()
+        if state is not None:
+            cache.set(auth_state_key(user_id), state, timeout=settings.AUTH_STATE_TIMEOUT)
+    return state
+
+
+class UserClaimsRefreshToken(RefreshToken):
+    """Refresh token (and derived access tokens) carrying the user's auth claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)  # Needs the stored password hash
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        state = load_auth_state(user_id)
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not state['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        known = {api_settings.USER_ID_FIELD: user_id, **state}
+        # from_db() expects values in concrete field order; everything else stays deferred
+        names = [field.attname for field in User._meta.concrete_fields if field.attname in known]
+        return User.from_db(DEFAULT_DB_ALIAS, names, [known[name] for name in names])
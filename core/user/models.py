@@ -67,6 +67,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # Users built from token claims defer most fields; load them together on first use
+        if fields is not None:
+            deferred = self.get_deferred_fields()
+            if deferred.intersection(fields):
+                fields = deferred.union(fields)
+        super().refresh_from_db(using, fields, **kwargs)
+
     def is_customer(self):
         return self.role == 'customer'
 
@@ -75,3 +83,13 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def is_admin(self):
         return self.role == 'admin'
+
+
+class RevokedToken(models.Model):
+    """A refresh token that may no longer be used; kept only until it would have expired anyway."""
+
+    jti = models.CharField(max_length=255, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
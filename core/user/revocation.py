@@ -0,0 +1,58 @@
+"""
+Refresh-token revocation keyed by ``jti``.
+
+A revoked token is written to the RevokedToken table (the durable record) and to
+the cache with a timeout equal to the token's remaining lifetime. Lookups hit the
+cache first and fall back to a primary-key lookup, so a check costs the same at
+any token volume. Rows for tokens that have expired are useless and are pruned
+opportunistically on revocation and by the ``prune_revoked_tokens`` command.
+"""
+import random
+from datetime import datetime, timezone
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone as django_timezone
+from core.utils.cache import cache
+from .models import RevokedToken
+
+PRUNE_PROBABILITY = 0.01
+
+
+def revoked_key(jti):
+    return f"revoked_token:{jti}"
+
+
+def is_revoked(jti, check_db=True):
+    """Whether ``jti`` was revoked; with check_db=False only the cache is consulted."""
+    if cache.get(revoked_key(jti)):
+        return True
+    return check_db and RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke(jti, exp):
+    """
+    Revoke a token expiring at ``exp`` (a Unix timestamp).
+
+    Returns False if it was already revoked: the insert doubles as the check, so two
+    concurrent refreshes with the same token can't both succeed.
+    """
+    expires_at = datetime.fromtimestamp(exp, tz=timezone.utc)
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+        revoked = True
+    except IntegrityError:
+        revoked = False
+
+    remaining = int(exp - django_timezone.now().timestamp())
+    if remaining > 0:
+        cache.set(revoked_key(jti), True, timeout=remaining)
+    if random.random() < PRUNE_PROBABILITY:
+        prune()
+    return revoked
+
+
+def prune():
+    """Delete revocations of tokens that have expired; returns the number removed."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lt=django_timezone.now()).delete()
+    return deleted
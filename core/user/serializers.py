@@ -1,12 +1,17 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .authentication import USER_CLAIMS, UserClaimsRefreshToken
+from .revocation import is_revoked, revoke
 
 User = get_user_model()
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Customize JWT token response to include user details."""
+    token_class = UserClaimsRefreshToken
 
     def validate(self, attrs):
         data = super().validate(attrs)
@@ -18,6 +23,41 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         })
         return data
 
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh that re-stamps the auth claims from the user row, so rotation never
+    carries stale ones, and revokes the used token when rotating.
+    """
+    token_class = UserClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        jti = refresh[api_settings.JTI_CLAIM]
+        revoke_used = api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION
+        # When rotating, the revoking insert below is the authoritative check
+        if is_revoked(jti, check_db=not revoke_used):
+            raise InvalidToken(_("Token is blacklisted"))
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first() if user_id else None
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        for claim in USER_CLAIMS:
+            refresh[claim] = getattr(user, claim)
+        data = {"access": str(refresh.access_token)}
+
+        if revoke_used and not revoke(jti, refresh["exp"]):
+            raise InvalidToken(_("Token is blacklisted"))
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+        return data
+
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for user profile data"""
 
@@ -39,7 +79,7 @@ class RegisterSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """Create a new user and return with JWT tokens"""
         user = User.objects.create_user(**validated_data)
-        refresh = RefreshToken.for_user(user)
+        refresh = UserClaimsRefreshToken.for_user(user)
 
         return {
             "refresh": str(refresh),
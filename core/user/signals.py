@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import User
+
+# simplejwt pulls in django.test and unittest, so core.user.authentication is
+# imported on first use rather than during django.setup()
+
+
+@receiver(post_save, sender=User)
+def refresh_auth_state(sender, instance, **kwargs):
+    """Make role/staff/active changes apply to already-issued tokens."""
+    from .authentication import remember_auth_state
+
+    remember_auth_state(instance)
+
+
+@receiver(post_delete, sender=User)
+def revoke_auth_state(sender, instance, **kwargs):
+    from .authentication import forget_auth_state
+
+    forget_auth_state(instance.pk)
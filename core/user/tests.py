@@ -1,3 +1,86 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from core.utils.cache import cache
+from .authentication import UserClaimsRefreshToken, auth_state_key
+from .models import User
 
-# Create your tests here.
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="buyer@example.com", password="pass12345")
+        self.client = APIClient()
+        token = UserClaimsRefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_cached_state_authenticates(self):
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 200)
+
+    def test_cache_miss_reads_the_database(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)  # Bypasses signals
+        cache.delete(auth_state_key(self.user.pk))
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 401)
+        self.assertEqual(cache.get(auth_state_key(self.user.pk))['is_active'], False)
+
+    def test_deleted_user_is_rejected(self):
+        user_id = self.user.pk
+        self.user.delete()
+        self.assertIsNone(cache.get(auth_state_key(user_id)))
+        response = self.client.get('/api/user/me/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['code'], 'user_not_found')
+
+
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self, email="nobody@example.com", **extra):
+        return self.client.post('/api/user/login/', {'email': email, 'password': 'wrong'}, format='json', **extra)
+
+    def test_rejects_after_the_burst_with_retry_after(self):
+        for _ in range(10):
+            self.assertEqual(self.login().status_code, 401)
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+    def test_forwarded_for_does_not_pick_the_bucket(self):
+        for n in range(10):
+            self.login(HTTP_X_FORWARDED_FOR=f"10.0.0.{n}")
+        self.assertEqual(self.login(HTTP_X_FORWARDED_FOR="10.0.1.1").status_code, 429)
+
+    def test_account_is_throttled_across_addresses(self):
+        for n in range(20):
+            self.assertEqual(self.login("victim@example.com", REMOTE_ADDR=f"10.0.0.{n}").status_code, 401)
+        self.assertEqual(self.login("Victim@example.com", REMOTE_ADDR="10.0.1.1").status_code, 429)
+        self.assertEqual(self.login("other@example.com", REMOTE_ADDR="10.0.1.1").status_code, 401)
+
+
+class RefreshTokenRevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="buyer@example.com", password="pass12345")
+        self.client = APIClient()
+        self.refresh = str(UserClaimsRefreshToken.for_user(self.user))
+
+    def refresh_with(self, token):
+        return self.client.post('/api/user/login/refresh/', {'refresh': token}, format='json')
+
+    def test_rotation_revokes_the_used_token(self):
+        response = self.refresh_with(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['refresh'], self.refresh)
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+        self.assertEqual(self.refresh_with(response.data['refresh']).status_code, 200)
+
+    def test_revocation_outlives_the_cache(self):
+        self.refresh_with(self.refresh)
+        cache.clear()
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+
+    def test_inactive_user_cannot_refresh(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
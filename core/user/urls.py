@@ -1,7 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
-from .views import CustomTokenObtainPairView, RegisterView, UserDetailView, UserViewSet
+from .views import CustomTokenObtainPairView, CustomTokenRefreshView, RegisterView, UserDetailView, UserViewSet
 from .views import UserViewSet
 
 router = DefaultRouter()
@@ -10,7 +9,7 @@ router.register('', UserViewSet, basename='user')
 
 urlpatterns = [
     path('login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('login/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('login/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
     path('register/', RegisterView.as_view(), name='register'),
     path('me/', UserDetailView.as_view(), name='user_detail'),
     path('', include(router.urls)),
@@ -1,11 +1,12 @@
 from rest_framework import generics, status, viewsets, permissions
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.contrib.auth import get_user_model
-from .serializers import CustomTokenObtainPairSerializer, UserSerializer, RegisterSerializer
+from .serializers import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer, UserSerializer, RegisterSerializer
 from .models import User
+from core.utils.throttling import AccountThrottle, GCRAThrottle
 
 User = get_user_model()
 
@@ -13,6 +14,13 @@ User = get_user_model()
 class CustomTokenObtainPairView(TokenObtainPairView):
     """Custom view to use our serializer for JWT authentication."""
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_scope = 'login'
+    throttle_classes = [GCRAThrottle, AccountThrottle]
+
+
+class CustomTokenRefreshView(TokenRefreshView):
+    """Refresh view that keeps the role/staff/active claims current."""
+    serializer_class = CustomTokenRefreshSerializer
 
 
 class RegisterView(generics.CreateAPIView):
@@ -20,6 +28,7 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [AllowAny]
+    throttle_scope = 'register'
 
 
 class UserDetailView(generics.RetrieveUpdateAPIView):
@@ -0,0 +1,274 @@
+import asyncio
+import math
+import random
+import threading
+import time
+import weakref
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.core.cache import caches
+from core.utils import profiling
+from core.utils.db import use_primary
+from core.utils.metrics import registry
+
+_MISSING = object()
+
+CACHE_REQUESTS = registry.counter(
+    'cache_requests_total', 'Cache reads by key namespace and result (hit/miss).', ('namespace', 'result')
+)
+CACHE_SECONDS = registry.counter(
+    'cache_operation_seconds_total', 'Time spent in cache calls, by key namespace.', ('namespace',)
+)
+
+
+class CacheStats:
+    """Process-local hit/miss/latency counters, grouped by key namespace."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {'hits': 0, 'misses': 0, 'writes': 0, 'deletes': 0, 'seconds': 0.0})
+
+    def record(self, namespace, elapsed, hits=0, misses=0, writes=0, deletes=0):
+        with self._lock:
+            stats = self._stats[namespace]
+            stats['hits'] += hits
+            stats['misses'] += misses
+            stats['writes'] += writes
+            stats['deletes'] += deletes
+            stats['seconds'] += elapsed
+
+    def snapshot(self):
+        """Return a copy of the counters with a derived hit ratio per namespace."""
+        with self._lock:
+            snapshot = {namespace: dict(stats) for namespace, stats in self._stats.items()}
+        for stats in snapshot.values():
+            reads = stats['hits'] + stats['misses']
+            stats['hit_ratio'] = round(stats['hits'] / reads, 4) if reads else None
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+stats = CacheStats()
+
+
+def key_namespace(key):
+    """Keys are namespaced with a ":" separator, e.g. "exchange_rate:USD" -> "exchange_rate"."""
+    return str(key).split(':', 1)[0]
+
+
+class InstrumentedCache:
+    """
+    Drop-in proxy for a configured Django cache that records per-namespace metrics.
+
+    Only the calls the app uses are instrumented; anything else is delegated as-is.
+    """
+
+    def __init__(self, alias='default'):
+        self._alias = alias
+
+    @property
+    def backend(self):
+        # caches[] is thread-local, so resolve it per call rather than once at import
+        return caches[self._alias]
+
+    def _observe(self, key, elapsed, **counts):
+        namespace = key_namespace(key)
+        stats.record(namespace, elapsed, **counts)
+        profiling.record('cache', elapsed)
+        CACHE_SECONDS.inc(elapsed, namespace=namespace)
+        if counts.get('hits'):
+            CACHE_REQUESTS.inc(namespace=namespace, result='hit')
+        elif counts.get('misses'):
+            CACHE_REQUESTS.inc(namespace=namespace, result='miss')
+
+    def get(self, key, default=None, version=None):
+        start = time.perf_counter()
+        value = self.backend.get(key, _MISSING, version=version)
+        hit = value is not _MISSING
+        self._observe(key, time.perf_counter() - start, hits=int(hit), misses=int(not hit))
+        return value if hit else default
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        start = time.perf_counter()
+        found = self.backend.get_many(keys, version=version)
+        elapsed = (time.perf_counter() - start) / max(len(keys), 1)
+        for key in keys:
+            hit = key in found
+            self._observe(key, elapsed, hits=int(hit), misses=int(not hit))
+        return found
+
+    def _timed_write(self, method, key, *args, deletes=0, **kwargs):
+        start = time.perf_counter()
+        result = getattr(self.backend, method)(key, *args, **kwargs)
+        self._observe(key, time.perf_counter() - start, writes=int(not deletes), deletes=deletes)
+        return result
+
+    def set(self, key, value, *args, **kwargs):
+        return self._timed_write('set', key, value, *args, **kwargs)
+
+    def add(self, key, value, *args, **kwargs):
+        return self._timed_write('add', key, value, *args, **kwargs)
+
+    def incr(self, key, *args, **kwargs):
+        return self._timed_write('incr', key, *args, **kwargs)
+
+    def delete(self, key, *args, **kwargs):
+        return self._timed_write('delete', key, *args, deletes=1, **kwargs)
+
+    def set_many(self, data, *args, **kwargs):
+        start = time.perf_counter()
+        result = self.backend.set_many(data, *args, **kwargs)
+        elapsed = (time.perf_counter() - start) / max(len(data), 1)
+        for key in data:
+            self._observe(key, elapsed, writes=1)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+
+cache = InstrumentedCache()
+
+
+_key_locks = defaultdict(threading.Lock)
+_key_locks_guard = threading.Lock()
+
+
+def _key_lock(key):
+    with _key_locks_guard:
+        return _key_locks[key]
+
+
+def get_or_compute(key, compute, timeout, jitter=0.1, beta=1.0, lock_timeout=30, wait=5.0, failure_timeout=0):
+    """
+    Return the cached value for key, computing it at most once across threads and workers.
+
+    Values are stored as (value, compute_seconds, expires_at) envelopes so callers can
+    refresh probabilistically before expiry (XFetch): the slower the computation and the
+    closer the expiry, the likelier a request is to refresh early while everyone else keeps
+    reading the current value. TTLs are shortened by up to ``jitter`` so entries filled
+    together don't expire together.
+
+    Only the holder of a short cache lock recomputes; other callers serve the stale value
+    if there is one, or wait up to ``wait`` seconds for the fill before computing themselves.
+    A None result is cached for ``failure_timeout`` seconds (not at all by default).
+    """
+    envelope = cache.get(key)
+    if envelope is not None and not _should_refresh(envelope, beta):
+        return envelope[0]
+
+    with _key_lock(key):
+        # Another thread of this worker may have refilled the key while we waited
+        envelope = cache.get(key)
+        if envelope is not None and not _should_refresh(envelope, beta):
+            return envelope[0]
+
+        lock_key = f"lock:{key}"
+        if cache.add(lock_key, 1, timeout=lock_timeout):
+            try:
+                return _fill(key, compute, timeout, jitter, lock_timeout, failure_timeout)
+            finally:
+                cache.delete(lock_key)
+
+        if envelope is not None:
+            return envelope[0]  # Someone else is refreshing; stale is fine meanwhile
+
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            envelope = cache.get(key)
+            if envelope is not None:
+                return envelope[0]
+        return _fill(key, compute, timeout, jitter, lock_timeout, failure_timeout)
+
+
+def _should_refresh(envelope, beta):
+    _, delta, expires_at = envelope
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+
+def _fill(key, compute, timeout, jitter, grace, failure_timeout):
+    start = time.perf_counter()
+    with use_primary():  # The entry outlives the request; a lagging replica would pin stale data
+        value = compute()
+    _store(key, value, time.perf_counter() - start, timeout, jitter, grace, failure_timeout)
+    return value
+
+
+def _store(key, value, delta, timeout, jitter, grace, failure_timeout):
+    ttl = failure_timeout if value is None else timeout * random.uniform(1 - jitter, 1)
+    if ttl > 0:
+        # Keep the entry past its logical expiry so it can be served while being refreshed
+        cache.set(key, (value, delta, time.time() + ttl), timeout=ttl + grace)
+
+
+# {event loop: {key: [lock, waiters]}}. asyncio locks belong to one loop, and under WSGI
+# each async view runs in a loop of its own, so every loop gets its own table; entries
+# go once their last waiter leaves, and a closed loop's table goes with the loop.
+_async_key_locks = weakref.WeakKeyDictionary()
+
+
+@asynccontextmanager
+async def _async_key_lock(key):
+    loop = asyncio.get_running_loop()
+    with _key_locks_guard:
+        locks = _async_key_locks.setdefault(loop, {})
+    entry = locks.get(key)
+    if entry is None:
+        entry = locks[key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del locks[key]
+
+
+async def aget_or_compute(key, compute, timeout, jitter=0.1, beta=1.0, lock_timeout=30, wait=5.0, failure_timeout=0):
+    """
+    Async counterpart of get_or_compute() for coroutine ``compute`` functions.
+
+    Cache calls stay synchronous: they are short local round-trips, and wrapping each
+    one in a thread would cost more than it saves. Only waiting and computing yield.
+    """
+    envelope = cache.get(key)
+    if envelope is not None and not _should_refresh(envelope, beta):
+        return envelope[0]
+
+    async with _async_key_lock(key):
+        envelope = cache.get(key)
+        if envelope is not None and not _should_refresh(envelope, beta):
+            return envelope[0]
+
+        lock_key = f"lock:{key}"
+        if cache.add(lock_key, 1, timeout=lock_timeout):
+            try:
+                return await _afill(key, compute, timeout, jitter, lock_timeout, failure_timeout)
+            finally:
+                cache.delete(lock_key)
+
+        if envelope is not None:
+            return envelope[0]
+
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            envelope = cache.get(key)
+            if envelope is not None:
+                return envelope[0]
+        return await _afill(key, compute, timeout, jitter, lock_timeout, failure_timeout)
+
+
+async def _afill(key, compute, timeout, jitter, grace, failure_timeout):
+    start = time.perf_counter()
+    with use_primary():
+        value = await compute()
+    _store(key, value, time.perf_counter() - start, timeout, jitter, grace, failure_timeout)
+    return value
@@ -0,0 +1,98 @@
+import hashlib
+import time
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from core.utils.cache import cache
+from core.utils.db import read_alias
+
+# Versions are kept for a month; a lost version is simply re-seeded with "now",
+# which costs clients one full response instead of serving stale data.
+VERSION_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def model_scope(model, pk=None):
+    """Return the version scope name for a model, or for a single row of it."""
+    scope = model._meta.label_lower
+    return f"{scope}:{pk}" if pk is not None else scope
+
+
+def get_version(scope):
+    """Return the current write version (a timestamp) for a scope, seeding it if missing."""
+    cache_key = f"version:{scope}"
+    version = cache.get(cache_key)
+    if version is None:
+        cache.add(cache_key, time.time(), timeout=VERSION_TIMEOUT)
+        version = cache.get(cache_key, time.time())
+    return version
+
+
+def bump_version(*scopes):
+    """Mark scopes as changed so validators computed from them stop matching."""
+    now = time.time()
+    cache.set_many({f"version:{scope}": now for scope in scopes}, timeout=VERSION_TIMEOUT)
+
+
+def bump_model_version(model, pk=None):
+    """Bump the model-wide version and, when given, the version of one row."""
+    scopes = [model_scope(model)]
+    if pk is not None:
+        scopes.append(model_scope(model, pk))
+    bump_version(*scopes)
+
+
+class ConditionalGetMixin:
+    """
+    Answer list/retrieve requests with 304 Not Modified when nothing they depend on has changed.
+
+    Validators are built from write versions (bumped by model signals) instead of the
+    serialized payload, so a matching request costs no queries and no serialization.
+    """
+
+    conditional_models = ()  # Models whose writes change the response
+    conditional_scopes = ()  # Extra non-model scopes, e.g. "exchange_rates"
+    conditional_actions = ('list', 'retrieve')
+    conditional_per_user = False  # Set when responses include per-user fields
+
+    def get_conditional_scopes(self):
+        scopes = [model_scope(model) for model in self.conditional_models]
+        scopes.extend(self.conditional_scopes)
+        if self.action == 'retrieve' and self.conditional_models:
+            # Detail responses only depend on their own row of the primary model
+            lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+            scopes[0] = model_scope(self.conditional_models[0], lookup)
+        return scopes
+
+    def get_validators(self, request):
+        """Return an (etag, last_modified) pair for the current request."""
+        versions = [get_version(scope) for scope in self.get_conditional_scopes()]
+        parts = [request.get_full_path(), request.headers.get('Accept', ''), *map(repr, versions)]
+        if self.conditional_per_user:
+            parts.append(str(request.user.pk))
+        raw = "|".join(parts)
+        etag = quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+        return etag, int(max(versions))
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.conditional_actions:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(request)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        # A lagging replica may not have the writes these versions stand for yet, and a
+        # validator on older data would let clients keep it after it changed
+        from_replica = read_alias() is not None and not getattr(response, 'read_from_primary', False)
+        if response.status_code == 200 and not from_replica:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
@@ -1,52 +1,124 @@
-import requests
+import time
 from decimal import Decimal
-from django.core.cache import cache
+from core.utils.cache import aget_or_compute, get_or_compute
 from django.conf import settings
 import logging
+from core.utils import profiling
+from core.utils.conditional import bump_version
+from core.utils.metrics import registry
 
 logger = logging.getLogger(__name__)  # Use Django logging instead of print statements
 
+BASE_CURRENCY = "ETB"
+RATES_CACHE_KEY = f"exchange_rate:{BASE_CURRENCY}"
+RATES_TIMEOUT = 60 * 60 * 6  # Cache the rate table for 6 hours
+RATES_FAILURE_TIMEOUT = 60  # Don't retry a failing API on every request
+
+RATE_FETCH_SECONDS = registry.histogram('exchange_rate_fetch_seconds', 'Exchange-rate API call latency.')
+RATE_FETCH_FAILURES = registry.counter(
+    'exchange_rate_fetch_failures_total', 'Failed exchange-rate API calls, by reason.', ('reason',)
+)
+
+
+def conversion_rates():
+    """Return the cached conversion table for BASE_CURRENCY, fetching it on a miss."""
+    # One API call returns every rate for the base currency, so the whole table is
+    # cached under a single key and refilled by one request at a time.
+    return get_or_compute(
+        RATES_CACHE_KEY, fetch_conversion_rates, timeout=RATES_TIMEOUT, failure_timeout=RATES_FAILURE_TIMEOUT
+    )
+
+
 def fetch_live_exchange_rate(target_currency):
     """Fetch real-time exchange rate from API with caching and error handling."""
-    if target_currency == "ETB":
+    if target_currency == BASE_CURRENCY:
         return Decimal("1.0")
 
-    cache_key = f"exchange_rate_{target_currency}"
-    cached_rate = cache.get(cache_key)
+    return _rate_from_table(conversion_rates(), target_currency)
 
-    if cached_rate:
-        logger.info(f"Cache hit for {target_currency}: {cached_rate}")
-        return Decimal(str(cached_rate))
 
-    api_key = settings.EXCHANGE_RATE_API_KEY
-    base_currency = "ETB"
-    url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest/{base_currency}"
+async def afetch_live_exchange_rate(target_currency):
+    """Async variant of fetch_live_exchange_rate that never blocks the event loop on HTTP."""
+    if target_currency == BASE_CURRENCY:
+        return Decimal("1.0")
 
+    conversion_rates = await aget_or_compute(
+        RATES_CACHE_KEY, afetch_conversion_rates, timeout=RATES_TIMEOUT, failure_timeout=RATES_FAILURE_TIMEOUT
+    )
+    return _rate_from_table(conversion_rates, target_currency)
+
+
+def fetch_conversion_rates():
+    """Fetch the conversion table for BASE_CURRENCY from the API, or None on failure."""
+    import requests  # Imported on first use, like httpx below
+
+    start = time.perf_counter()
     try:
-        response = requests.get(url, timeout=5)
-        if response.status_code != 200:
-            logger.error(f"Error fetching exchange rate: {response.status_code}, {response.text}")
-            return Decimal("1.0")
+        with profiling.timed('http'):
+            response = requests.get(_rates_url(), timeout=5)
+    except requests.exceptions.RequestException as e:
+        logger.error("Request error fetching exchange rate: %s", e)
+        RATE_FETCH_FAILURES.inc(reason='network')
+        return None
+    finally:
+        RATE_FETCH_SECONDS.observe(time.perf_counter() - start)
+    return _conversion_rates_from(response)
 
-        data = response.json()
-        logger.info(f"API Response: {data}")
 
-        if not isinstance(data, dict) or "conversion_rates" not in data:
-            logger.warning(f"Invalid API response format: {data}")
-            return Decimal("1.0")
+async def afetch_conversion_rates():
+    """Async variant of fetch_conversion_rates using httpx."""
+    import httpx  # Only async workers pay for importing the client
 
-        conversion_rates = data["conversion_rates"]
-        exchange_rate = conversion_rates.get(target_currency)
+    start = time.perf_counter()
+    try:
+        with profiling.timed('http'):
+            async with httpx.AsyncClient(timeout=5) as client:
+                response = await client.get(_rates_url())
+    except httpx.HTTPError as e:
+        logger.error("Request error fetching exchange rate: %s", e)
+        RATE_FETCH_FAILURES.inc(reason='network')
+        return None
+    finally:
+        RATE_FETCH_SECONDS.observe(time.perf_counter() - start)
+    return _conversion_rates_from(response)
 
-        if exchange_rate is None:
-            logger.warning(f"Exchange rate for {target_currency} not found. Using fallback.")
-            return Decimal("1.0")
 
-        # Cache the exchange rate for 6 hours
-        cache.set(cache_key, exchange_rate, timeout=60 * 60 * 6)
+def _rates_url():
+    api_key = settings.EXCHANGE_RATE_API_KEY
+    return f"https://v6.exchangerate-api.com/v6/{api_key}/latest/{BASE_CURRENCY}"
 
-        return Decimal(str(exchange_rate))
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Request error fetching exchange rate: {e}")
+def _conversion_rates_from(response):
+    """Extract the conversion table from a requests/httpx response, or None if unusable."""
+    if response.status_code != 200:
+        logger.error("Error fetching exchange rate: %s, %s", response.status_code, response.text)
+        RATE_FETCH_FAILURES.inc(reason='status')
+        return None
+
+    try:
+        data = response.json()
+    except ValueError:  # An HTML error page or a truncated body; covers httpx's decode errors too
+        logger.warning("Exchange rate API returned a non-JSON body: %.200s", response.text)
+        RATE_FETCH_FAILURES.inc(reason='invalid')
+        return None
+    logger.debug("Exchange rate API response: %s", data)
+
+    if not isinstance(data, dict) or "conversion_rates" not in data:
+        logger.warning("Invalid API response format: %s", data)
+        RATE_FETCH_FAILURES.inc(reason='invalid')
+        return None
+
+    bump_version("exchange_rates")
+    return data["conversion_rates"]
+
+
+def _rate_from_table(conversion_rates, target_currency):
+    if conversion_rates is None:
         return Decimal("1.0")
+
+    exchange_rate = conversion_rates.get(target_currency)
+    if exchange_rate is None:
+        logger.warning("Exchange rate for %s not found. Using fallback.", target_currency)
+        return Decimal("1.0")
+
+    return Decimal(str(exchange_rate))
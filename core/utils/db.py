@@ -0,0 +1,76 @@
+"""Database connection settings helpers, read routing state, query counting and pool metrics."""
+import contextvars
+from contextlib import contextmanager
+
+# Alias safe reads go to for the current request; None means the primary. Set by
+# core.utils.replicas.ReadReplicaMixin and read by its router.
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+
+
+def read_alias():
+    """Return the replica this context reads from, or None when it reads the primary."""
+    return _read_alias.get()
+
+
+@contextmanager
+def use_primary():
+    """
+    Read from the primary inside the block.
+
+    Shared caches are keyed by write versions, so anything stored in them must be
+    computed from data at least as new as those versions, which a lagging replica
+    can't promise.
+    """
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+# Connections one worker process can hold at once, per gunicorn worker class: a sync
+# worker serves one request at a time, a threaded one one per thread, and ASGI runs
+# sync ORM work on one thread per worker. One extra covers background threads such
+# as the product view flusher. gevent opens one connection per in-flight greenlet.
+POOL_SIZE_BY_WORKER_CLASS = {
+    'sync': lambda threads: 2,
+    'gthread': lambda threads: threads + 1,
+    'uvicorn': lambda threads: 4,
+    'gevent': lambda threads: 10,
+}
+
+
+def default_pool_size(worker_class, threads=1):
+    for name, size in POOL_SIZE_BY_WORKER_CLASS.items():
+        if name in worker_class:  # Also matches e.g. "uvicorn.workers.UvicornWorker"
+            return size(threads)
+    return threads + 1
+
+
+class QueryCounter:
+    """
+    execute_wrapper that counts the queries run through it.
+
+    Unlike CaptureQueriesContext it doesn't depend on connection.queries_log, which
+    stops growing at 9000 entries and would report zero queries in long runs.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def collect_pool_stats():
+    """Metrics collector exporting psycopg pool statistics for every pooled alias."""
+    # Imported here because settings imports this module for default_pool_size()
+    from django.db import connections
+    from core.utils.metrics import registry
+
+    for alias in connections:
+        connection = connections[alias]
+        if connection.vendor != 'postgresql' or not connection.settings_dict['OPTIONS'].get('pool'):
+            continue
+        for name, value in connection.pool.get_stats().items():
+            registry.gauge(f'db_pool_{name}', f'psycopg pool statistic "{name}".', ('alias',)).set(value, alias=alias)
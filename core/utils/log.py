@@ -0,0 +1,129 @@
+"""
+Non-blocking JSON logging.
+
+Request threads only put records on an in-memory queue; a listener thread formats
+them as one JSON object per line and writes them out. Wired up through LOGGING in
+settings: ``queue_handler`` is the handler factory, ``RequestIdFilter`` stamps
+each record with the current request id and ``RateLimitFilter`` caps how often a
+hot-path message can repeat.
+"""
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+_request_id = contextvars.ContextVar('request_id', default=None)
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+def set_request_id(request_id):
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token):
+    _request_id.reset(token)
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the id of the request being served (if any) to each record."""
+
+    def filter(self, record):
+        # django.request logs after the middleware chain has returned, but passes the request
+        record.request_id = _request_id.get() or getattr(getattr(record, 'request', None), 'request_id', None)
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let each message template through at most ``burst`` times per ``interval`` seconds.
+
+    Records are grouped by logger, level and unformatted message, so callers must pass
+    arguments %-style rather than pre-formatting them. The first record of a new window
+    carries the number of records dropped in the previous one as ``suppressed``.
+    """
+
+    def __init__(self, interval=60, burst=1):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            started, emitted, suppressed = self._windows.get(key, (now, 0, 0))
+            if now - started >= self.interval:
+                if suppressed:
+                    record.suppressed = suppressed
+                started, emitted, suppressed = now, 0, 0
+            if emitted >= self.burst:
+                self._windows[key] = (started, emitted, suppressed + 1)
+                return False
+            self._windows[key] = (started, emitted + 1, suppressed)
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    def __init__(self, target):
+        super().__init__(queue.SimpleQueue())
+        self.target = target
+        self._start_listener()
+        # A listener thread doesn't survive fork (e.g. gunicorn --preload), so start a new one
+        os.register_at_fork(after_in_child=self._start_listener)
+
+    def _start_listener(self):
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def prepare(self, record):
+        # Merge args now, since they may change once the caller moves on, but leave the
+        # JSON encoding to the listener thread
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def close(self):
+        self.listener.stop()  # Drains whatever is still queued
+        self.target.close()
+        super().close()
+
+
+def queue_handler(stream=None):
+    """Handler factory for LOGGING: JSON lines written to ``stream`` (stderr) off the request thread."""
+    target = logging.StreamHandler(stream)
+    target.setFormatter(JSONFormatter())
+    return _QueueHandler(target)
@@ -0,0 +1,237 @@
+"""
+Minimal Prometheus-compatible metrics registry.
+
+Metrics live in process memory. With several gunicorn workers, set METRICS_DIR:
+each worker then periodically writes a snapshot there and ``/metrics`` merges the
+snapshots of all live workers, so a scrape sees the whole server rather than
+whichever worker happened to answer it.
+"""
+import json
+import math
+import os
+import threading
+import time
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            return [[dict(zip(self.labelnames, key)), self._copy(value)] for key, value in self._values.items()]
+
+    def _copy(self, value):
+        return value
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['buckets'][index] += 1
+                    break
+            entry['sum'] += value
+            entry['count'] += 1
+
+    def _copy(self, value):
+        return {'buckets': list(value['buckets']), 'sum': value['sum'], 'count': value['count']}
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def _register(self, cls, name, documentation, labelnames=(), **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector):
+        """Add a callable run at snapshot time to refresh metrics derived from other state."""
+        self._collectors.append(collector)
+
+    def snapshot(self):
+        for collector in self._collectors:
+            collector()
+        return {
+            metric.name: {
+                'type': metric.type,
+                'help': metric.documentation,
+                'buckets': [str(bound) for bound in getattr(metric, 'buckets', ())],
+                'samples': metric.samples(),
+            }
+            for metric in list(self._metrics.values())
+        }
+
+    def maybe_flush(self):
+        """Write this worker's snapshot to METRICS_DIR at most every METRICS_FLUSH_INTERVAL seconds."""
+        if not settings.METRICS_DIR or time.monotonic() - self._last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = os.path.join(settings.METRICS_DIR, f"{os.getpid()}.json")
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(f"{path}.tmp", path)  # Readers never see a half-written file
+
+    def collect(self):
+        """Return the merged snapshot of this process and, with METRICS_DIR, every live worker."""
+        if not settings.METRICS_DIR:
+            return self.snapshot()
+
+        self.flush()
+        snapshots = []
+        for name in os.listdir(settings.METRICS_DIR):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(settings.METRICS_DIR, name)
+            if not _pid_alive(int(name[:-5])):
+                remove_snapshot(path)
+                continue
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return merge(snapshots)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_snapshot(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def merge(snapshots):
+    """Sum samples with identical labels across worker snapshots."""
+    merged, indexes = {}, {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, 'samples': []})
+            index = indexes.setdefault(name, {})
+            for labels, value in metric['samples']:
+                key = json.dumps(labels, sort_keys=True)
+                existing = index.get(key)
+                if existing is None:
+                    index[key] = [labels, value]
+                    target['samples'].append(index[key])
+                elif metric['type'] == 'histogram':
+                    existing[1] = {
+                        'buckets': [a + b for a, b in zip(existing[1]['buckets'], value['buckets'])],
+                        'sum': existing[1]['sum'] + value['sum'],
+                        'count': existing[1]['count'] + value['count'],
+                    }
+                else:
+                    existing[1] += value
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, **extra):
+    labels = {**labels, **extra}
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def render(snapshot):
+    """Render a snapshot in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name, metric in sorted(snapshot.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in metric['samples']:
+            if metric['type'] != 'histogram':
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric['buckets'], value['buckets']):
+                cumulative += count
+                le = '+Inf' if bound == 'inf' else bound
+                lines.append(f"{name}_bucket{_format_labels(labels, le=le)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {value['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
@@ -0,0 +1,76 @@
+"""
+Per-request phase timing.
+
+A RequestProfile is active only while ProfilingMiddleware is profiling the current
+request; record() and timed() are no-ops otherwise, so instrumented code paths cost
+one context-variable lookup when profiling is off.
+"""
+import contextvars
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+_current_profile = contextvars.ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_finished = None  # Set once the view returns an unrendered response
+        self.phases = defaultdict(lambda: {'seconds': 0.0, 'count': 0})
+        self.statements = defaultdict(lambda: {'seconds': 0.0, 'count': 0})
+
+    def add(self, phase, seconds):
+        entry = self.phases[phase]
+        entry['seconds'] += seconds
+        entry['count'] += 1
+
+    def add_query(self, sql, seconds):
+        self.add('db', seconds)
+        entry = self.statements[sql]
+        entry['seconds'] += seconds
+        entry['count'] += 1
+
+    def top_statements(self, limit=5):
+        ranked = sorted(self.statements.items(), key=lambda item: item[1]['seconds'], reverse=True)
+        return [
+            {'sql': sql[:500], 'ms': round(entry['seconds'] * 1000, 2), 'count': entry['count']}
+            for sql, entry in ranked[:limit]
+        ]
+
+    def summary(self):
+        return {
+            phase: {'ms': round(entry['seconds'] * 1000, 2), 'count': entry['count']}
+            for phase, entry in self.phases.items()
+        }
+
+
+def current_profile():
+    return _current_profile.get()
+
+
+def activate(profile):
+    return _current_profile.set(profile)
+
+
+def deactivate(token):
+    _current_profile.reset(token)
+
+
+def record(phase, seconds):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase):
+    """Attribute the time spent in the block to ``phase`` of the current request's profile."""
+    if _current_profile.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start)
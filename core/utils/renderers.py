@@ -0,0 +1,64 @@
+"""
+JSON renderer and parser backed by orjson when it is installed.
+
+Output matches DRF's JSONRenderer: compact UTF-8, Decimal as a number, datetimes
+in DRF's ISO format (``Z`` for UTC), UUIDs as strings, U+2028/U+2029 escaped.
+Without orjson, or when a client asks for an indent other than 2, the stock
+stdlib-based implementation is used.
+"""
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib fallback handles everything, just slower
+    orjson = None
+
+if orjson is not None:
+    # Datetimes go through DRF's encoder so they render exactly as before
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    _encoder = JSONEncoder()
+
+
+def dumps(data, indent=None):
+    """Encode ``data`` to JSON bytes the way DRF's JSONRenderer would."""
+    if orjson is None or indent not in (None, 2):
+        return JSONRenderer().render(data, renderer_context={'indent': indent})
+
+    options = OPTIONS | orjson.OPT_INDENT_2 if indent else OPTIONS
+    content = orjson.dumps(data, default=_encoder.default, option=options)
+    # Valid JSON, but not valid JavaScript; DRF escapes these too
+    return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+def loads(content, encoding=None):
+    """Decode JSON bytes in ``encoding`` (UTF-8 by default)."""
+    if encoding and encoding.lower() not in ('utf-8', 'utf8'):
+        content = content.decode(encoding)
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        return dumps(data, indent=indent)
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            return loads(stream.read(), encoding)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,66 @@
+"""
+Read-replica routing.
+
+Views opt in with ReadReplicaMixin: their safe-method requests read from a random
+replica (DATABASE_REPLICA_URLS) for the rest of the request. After a successful
+write through an opted-in view the user is pinned to the primary for
+REPLICA_PIN_SECONDS, so replication lag never hides their own changes from them.
+Everything else, including all writes, uses ``default``, and so does anything
+computed for a shared cache (see core.utils.db.use_primary).
+"""
+import random
+
+from django.conf import settings
+from rest_framework import permissions
+from core.utils.cache import cache
+from core.utils.db import _read_alias, read_alias
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+def pin_key(user_id):
+    return f"replica_pin:{user_id}"
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return read_alias() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Replicas hold the same data as the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'  # Replicas get their schema through replication
+
+
+class ReadReplicaMixin:
+    """Route this viewset's safe-method reads to a replica unless the user wrote recently."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._replica_token = None
+        aliases = replica_aliases()
+        if not aliases or request.method not in permissions.SAFE_METHODS:
+            return
+        if request.user.is_authenticated and cache.get(pin_key(request.user.pk)):
+            return
+        self._replica_token = _read_alias.set(random.choice(aliases))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._replica_token = None
+        elif (
+            request.method not in permissions.SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+            and replica_aliases()
+        ):
+            cache.set(pin_key(request.user.pk), True, timeout=settings.REPLICA_PIN_SECONDS)
+        return super().finalize_response(request, response, *args, **kwargs)
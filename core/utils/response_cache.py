@@ -0,0 +1,75 @@
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from core.utils.cache import cache
+from core.utils.conditional import ConditionalGetMixin, get_version
+from core.utils.db import use_primary
+
+# Headers that change the rendered body (content negotiation) or who may see it
+VARY_HEADERS = ('Accept', 'Authorization')
+
+
+class CachedResponseMixin:
+    """
+    Serve anonymous safe requests from a full rendered-response cache.
+
+    Must be listed after ConditionalGetMixin: cache keys embed the same write
+    versions used for ETags, so a signal bumping a model's version makes every
+    cached page for it unreachable at once. Only 200 responses are cached or
+    marked public.
+    """
+
+    response_cache_actions = ('list', 'retrieve')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        mro = cls.__mro__
+        if ConditionalGetMixin not in mro or mro.index(ConditionalGetMixin) > mro.index(CachedResponseMixin):
+            # Otherwise cache hits would skip 304 handling, and keys would have no versions
+            raise ImproperlyConfigured(f"{cls.__name__} must list ConditionalGetMixin before CachedResponseMixin")
+
+    def get_response_cache_key(self, request):
+        versions = [get_version(scope) for scope in self.get_conditional_scopes()]
+        raw = "|".join([
+            request.build_absolute_uri(),  # Absolute image URLs depend on scheme and host
+            *(request.headers.get(header, '') for header in VARY_HEADERS),
+            *map(repr, versions),
+        ])
+        return f"response:{hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()}"
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.response_cache_actions or request.user.is_authenticated:
+            response = handler(request, *args, **kwargs)
+            patch_vary_headers(response, VARY_HEADERS)
+            return response
+
+        cache_key = self.get_response_cache_key(request)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+        else:
+            with use_primary():  # The stored page must be as new as the versions in its key
+                response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.add_post_render_callback(
+                    lambda rendered: cache.set(
+                        cache_key, (rendered.content, rendered['Content-Type']),
+                        timeout=settings.RESPONSE_CACHE_TIMEOUT,
+                    )
+                )
+
+        response.read_from_primary = True  # Cached pages are always filled from the primary
+        patch_vary_headers(response, VARY_HEADERS)
+        if response.status_code == 200:  # A 404 or 400 may stop being one as soon as data changes
+            patch_cache_control(response, public=True, max_age=settings.RESPONSE_CACHE_MAX_AGE)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
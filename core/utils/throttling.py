@@ -0,0 +1,156 @@
+"""
+Rate limiting with GCRA (the generic cell rate algorithm, a token bucket).
+
+Each client key stores a single timestamp, the theoretical arrival time (TAT) of
+its next request, instead of DRF's list of recent request times. A rate of N per
+period admits bursts of up to N requests and then one every period / N seconds.
+
+On Redis the check-and-update runs as one Lua script, so it is atomic across
+workers and hosts. Other backends serialize updates with a short-lived cache lock.
+"""
+import hashlib
+import math
+import threading
+import time
+import zlib
+
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from core.utils.cache import cache
+from core.utils.metrics import registry
+
+THROTTLED = registry.counter('http_throttled_total', 'Requests rejected by rate limits, by scope.', ('scope',))
+
+LOCK_WAIT = 0.1  # Give up on a stuck lock and admit the request rather than stall it
+
+GCRA_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local interval, period = tonumber(ARGV[1]), tonumber(ARGV[2])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+local wait = tat + interval - now - period
+if wait > 0 then
+    return {0, string.format('%.6f', wait)}
+end
+redis.call('SET', KEYS[1], string.format('%.6f', tat + interval), 'PX', math.ceil((tat + interval - now) * 1000))
+return {1, '0'}
+"""
+
+_locks = [threading.Lock() for _ in range(64)]
+_script = None
+
+
+def _store():
+    backend = cache.backend
+    return getattr(backend, 'shared', backend)  # A TwoTierCache's local tier would split buckets per worker
+
+
+def gcra(key, interval, period):
+    """Admit one request for ``key``; returns (allowed, seconds until the next one would be)."""
+    backend = _store()
+    if isinstance(backend, RedisCache):
+        return _redis_gcra(backend, key, interval, period)
+    return _locked_gcra(backend, key, interval, period)
+
+
+def _redis_gcra(backend, key, interval, period):
+    global _script
+    key = backend.make_and_validate_key(key)
+    client = backend._cache.get_client(key, write=True)
+    if _script is None:
+        _script = client.register_script(GCRA_SCRIPT)
+    allowed, wait = _script(keys=[key], args=[interval, period], client=client)
+    return bool(allowed), float(wait)
+
+
+def _locked_gcra(backend, key, interval, period):
+    lock_key = f"{key}:lock"
+    with _locks[zlib.crc32(key.encode()) % len(_locks)]:
+        deadline = time.monotonic() + LOCK_WAIT
+        locked = backend.add(lock_key, 1, timeout=1)
+        while not locked and time.monotonic() < deadline:
+            time.sleep(0.005)
+            locked = backend.add(lock_key, 1, timeout=1)
+        try:
+            now = time.time()
+            tat = max(backend.get(key, now), now)
+            wait = tat + interval - now - period
+            if wait > 0:
+                return False, wait
+            backend.set(key, tat + interval, timeout=math.ceil(tat + interval - now))
+            return True, 0.0
+        finally:
+            if locked:
+                backend.delete(lock_key)
+
+
+def parse_rate(rate):
+    """Turn a DRF rate such as '10/min' into (requests, period in seconds)."""
+    num, period = rate.split('/')
+    return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+class GCRAThrottle(BaseThrottle):
+    """
+    Scoped GCRA throttle, keyed by user (or client IP when anonymous).
+
+    The scope is ``view.throttle_scopes[view.action]`` or ``view.throttle_scope``, and
+    its rate comes from DEFAULT_THROTTLE_RATES; views without a scope are not throttled.
+    """
+
+    def get_scope(self, view):
+        scopes = getattr(view, 'throttle_scopes', {})
+        return scopes.get(getattr(view, 'action', None)) or getattr(view, 'throttle_scope', None)
+
+    def get_rate(self, scope):
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[scope]
+        except KeyError:
+            raise ImproperlyConfigured(f"No default throttle rate set for '{scope}' scope")
+
+    def get_cache_key(self, request, view):
+        user = request.user
+        ident = user.pk if user and user.is_authenticated else self.get_ident(request)
+        return f"throttle:{self.scope}:{ident}"
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(view)
+        if not self.scope:
+            return True
+        rate = self.get_rate(self.scope)
+        if rate is None:  # Set to None to switch a scope off
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        num_requests, duration = parse_rate(rate)
+        allowed, self._wait = gcra(key, duration / num_requests, duration)
+        if not allowed:
+            THROTTLED.inc(scope=self.scope)
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class AccountThrottle(GCRAThrottle):
+    """
+    Throttle keyed by the account a request names, e.g. the email sent to the login view.
+
+    Guesses against one account share a bucket however many addresses they come from.
+    """
+    scope = 'login_account'
+    field = 'email'
+
+    def get_scope(self, view):
+        return self.scope
+
+    def get_cache_key(self, request, view):
+        value = request.data.get(self.field) if hasattr(request.data, 'get') else None
+        if not isinstance(value, str) or not value.strip():
+            return None
+        digest = hashlib.sha256(value.strip().lower().encode()).hexdigest()
+        return f"throttle:{self.scope}:{digest}"
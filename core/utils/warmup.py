@@ -0,0 +1,42 @@
+"""
+Cache priming run by gunicorn before workers take traffic (see gunicorn.conf.py).
+
+With a preloaded app this runs once in the master, so the imported view modules
+and a per-process cache are inherited by every worker; otherwise each worker
+primes itself after booting.
+"""
+import logging
+import time
+
+from django.db import connections
+from django.urls import get_resolver
+from core.product.facets import category_tree, city_names
+from core.product.geo import region_city_ids
+from core.utils.currency import conversion_rates
+
+logger = logging.getLogger(__name__)
+
+STEPS = (
+    ('urlconf', lambda: get_resolver().url_patterns),  # Imports every view module
+    ('category_tree', category_tree),
+    ('city_names', city_names),
+    ('city_regions', lambda: region_city_ids('')),
+    ('exchange_rates', conversion_rates),
+)
+
+
+def warm_up():
+    """Fill the caches the first requests need; returns {step: seconds}. Failures are logged, not raised."""
+    timings = {}
+    try:
+        for name, step in STEPS:
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception:
+                logger.exception("Warm-up step %s failed", name)
+                continue
+            timings[name] = time.perf_counter() - start
+    finally:
+        connections.close_all()  # Never hand an open connection to forked workers
+    return timings
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from core.utils.cache import stats
+from core.utils.metrics import registry, render
+
+
+class CacheStatsView(APIView):
+    """Per-namespace cache hit/miss/latency counters for the worker serving the request."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(stats.snapshot())
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; a plain view so scrapes skip DRF authentication."""
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not constant_time_compare(request.headers.get('Authorization', ''), expected):
+            return HttpResponse(status=401)
+    elif not settings.DEBUG:
+        return HttpResponse(status=404)  # Off in production until a token is configured
+    return HttpResponse(render(registry.collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,83 @@
+"""
+Gunicorn settings, read from the environment (and .env, like config.settings).
+
+GUNICORN_WORKER_CLASS picks the concurrency model:
+
+* gthread  GUNICORN_THREADS requests per process, so a thread waiting on the rate
+           API or the database doesn't stall the whole worker (the default);
+* sync     one request per process;
+* gevent   GUNICORN_WORKER_CONNECTIONS greenlets per process (needs gevent, and
+           psycogreen so psycopg2 yields);
+* uvicorn  the ASGI application, for the async views (needs uvicorn).
+
+The app is preloaded in the master so workers share its memory copy-on-write, and
+each worker is replaced after about GUNICORN_MAX_REQUESTS requests. Caches are
+primed before traffic arrives unless GUNICORN_WARM_UP is off.
+
+    gunicorn -c gunicorn.conf.py
+"""
+import multiprocessing
+import os
+
+import environ
+
+env = environ.Env()
+environ.Env.read_env(os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env'))
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'gevent': 'gevent',
+    'uvicorn': 'uvicorn.workers.UvicornWorker',
+}
+
+mode = env('GUNICORN_WORKER_CLASS', default='gthread')
+if mode not in WORKER_CLASSES:
+    raise ValueError(f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, not {mode!r}")
+
+worker_class = WORKER_CLASSES[mode]
+wsgi_app = 'config.asgi:application' if mode == 'uvicorn' else 'config.wsgi:application'
+bind = env('GUNICORN_BIND', default=f"0.0.0.0:{env('PORT', default='8000')}")
+
+# Blocking workers need spare processes; event-loop workers scale within one per core
+cores = multiprocessing.cpu_count()
+workers = env.int('GUNICORN_WORKERS', default=cores * 2 + 1 if mode in ('sync', 'gthread') else cores)
+# Gunicorn silently turns sync into gthread when threads > 1
+threads = env.int('GUNICORN_THREADS', default=4) if mode == 'gthread' else 1
+worker_connections = env.int('GUNICORN_WORKER_CONNECTIONS', default=100)
+
+# gevent must patch the standard library before the app imports it, i.e. in the worker
+preload_app = env.bool('GUNICORN_PRELOAD', default=mode != 'gevent')
+max_requests = env.int('GUNICORN_MAX_REQUESTS', default=1000)
+max_requests_jitter = env.int('GUNICORN_MAX_REQUESTS_JITTER', default=100)
+
+timeout = env.int('GUNICORN_TIMEOUT', default=30)
+graceful_timeout = env.int('GUNICORN_GRACEFUL_TIMEOUT', default=30)
+keepalive = env.int('GUNICORN_KEEPALIVE', default=5)
+
+warm_up = env.bool('GUNICORN_WARM_UP', default=True)
+
+
+def _warm_up(log):
+    from core.utils.warmup import warm_up as prime
+
+    for step, seconds in prime().items():
+        log.info("Warmed %s in %.0f ms", step, seconds * 1000)
+
+
+def when_ready(server):
+    if warm_up and preload_app:
+        _warm_up(server.log)
+
+
+def post_fork(server, worker):
+    if mode == 'gevent':
+        # Make psycopg2 wait on the socket through gevent instead of blocking the worker
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()
+
+
+def post_worker_init(worker):
+    if warm_up and not preload_app:
+        _warm_up(worker.log)